@@ -0,0 +1,40 @@
+#! /usr/bin/env python3
+
+# Decompounding as a Service for several models using an HTTP server
+
+import argparse
+import logging
+
+from secos.registry import ModelRegistry
+from secos.server import serve
+
+logging.basicConfig(
+    format="%(asctime)s : %(levelname)s : %(message)s", level=logging.INFO
+)
+
+
+parser = argparse.ArgumentParser(
+    description="Decompounding as a Service for several models using an HTTP server"
+)
+parser.add_argument(
+    "config",
+    help="JSON file describing the models by name and the memory budget, see "
+    "ModelRegistry.from_config",
+)
+parser.add_argument("port", type=int, help="Port the server will run")
+parser.add_argument(
+    "--default", help="model used when none is given (default: the first one)"
+)
+parser.add_argument(
+    "--workers",
+    type=int,
+    default=16,
+    help="number of worker threads shared by all models (default: 16)",
+)
+args = parser.parse_args()
+
+registry = ModelRegistry.from_config(args.config)
+
+
+if __name__ == "__main__":
+    serve(registry, port=args.port, default_model=args.default, workers=args.workers)
@@ -4,9 +4,9 @@
 
 import logging
 import sys
-from typing import Iterable
 
 from secos import Splitter
+from secos.batch import ChunkedBatch
 
 logging.basicConfig(
     format="%(asctime)s : %(levelname)s : %(message)s", level=logging.INFO
@@ -17,20 +17,12 @@ def eprint(*args, **kwargs) -> None:
     print(*args, file=sys.stderr, **kwargs)
 
 
-def get_first_dash(compounds: Iterable[str]) -> int:
-    i = 0
-    for c in compounds:
-        if "-" in c:
-            return i
-        i += 1
-    return -1
-
-
 if len(sys.argv) < 11:
     eprint(
         f"python {sys.argv[0]} dt_candidates word_count_file "
         "min_word_count(50) file_compound word_index prefix_length(3) "
-        "suffix_length(3) word_length(5) dash_word(3) upper(upper) epsilon"
+        "suffix_length(3) word_length(5) dash_word(3) upper(upper) epsilon "
+        "[output_file [chunk_size(100000)]]"
     )
     eprint("-----------------------------------------------------")
     eprint("Parameter description:")
@@ -70,6 +62,10 @@ if len(sys.argv) < 11:
         "set for case-sensitive languages e.g. German"
     )
     eprint("epsilon:\t\tsmoothing factor (recommended parameter: 0.01")
+    eprint(
+        "output_file:\t\toptional file to write to instead of the standard output, "
+        "in resumable chunks of chunk_size lines"
+    )
     sys.exit(1)
 
 decompounder = Splitter(
@@ -93,35 +89,30 @@ decompounder.prepare_decompounding(file_wordcount, file_knowledge)
 file_compound = sys.argv[4]
 word_index_file_compound = int(sys.argv[5])
 
-logging.info("decompound")
-for l in open(file_compound):
+
+def diagnose(l: str) -> str:
+    """
+    Return the candidates of each method for the word of the line, and the chosen
+    split, followed by the line itself.
+    """
     ls = l.strip().split("\t")
     w = ls[word_index_file_compound]
     wc = -1
     if w in decompounder.word_count:
         wc = decompounder.word_count[w]
-    # NOTE: the following is just Decompounder.split_compound with debugging info
-    c1 = decompounder.comp1.get(w, w)
-    c2 = decompounder.comp2.get(w, w)
-    c3 = decompounder.comp3.get(w, w)
-    (u, ufeats) = decompounder._unknown_word_compounding(w)
-    prefix = "W"
-    cand = w
-    feats = ""
-    cands = [c1, c2, c3, u]
-    cands_str = ["C1", "C2", "C3", "U"]
-    idx = get_first_dash(cands)
-    if idx >= 0:
-        cand = cands[idx]
-        prefix = cands_str[idx]
-    (idx, prob) = decompounder._get_highest_prob(cands)
-    pcand = w
-    pprefix = "W"
-    if idx >= 0:
-        pcand = cands[idx]
-        pprefix = cands_str[idx]
-
-    print(
-        f"{pprefix}\t{pcand}\t{prefix}\t{cand}\t{c1}\t{c2}\t{c3}\t{u}\t{wc}\t"
-        f"{l.strip()}"
-    )
+    columns = decompounder.diagnostic_columns(w)
+    return "\t".join(columns) + f"\t{wc}\t{l.strip()}"
+
+
+logging.info("decompound")
+if len(sys.argv) > 12:
+    ChunkedBatch(
+        input=file_compound,
+        output=sys.argv[12],
+        process=diagnose,
+        chunk_size=int(sys.argv[13]) if len(sys.argv) > 13 else 100000,
+        key=decompounder.fingerprint(file_wordcount, file_knowledge),
+    ).run()
+else:
+    for l in open(file_compound):
+        print(diagnose(l))
@@ -6,6 +6,7 @@ import logging
 import sys
 
 from secos import Splitter
+from secos.cache import PersistentSplitCache
 
 logging.basicConfig(
     format="%(asctime)s : %(levelname)s : %(message)s", level=logging.INFO
@@ -16,11 +17,11 @@ def eprint(*args, **kwargs) -> None:
     print(*args, file=sys.stderr, **kwargs)
 
 
-if len(sys.argv) < 9:
+if len(sys.argv) < 10:
     eprint(
         f"python {sys.argv[0]} dt_candidates word_count_file min_word_count(50) "
-        "word_index prefix_length(3) suffix_length(3) word_length(5) dash_word(3) "
-        "upper(upper) epsilon"
+        "prefix_length(3) suffix_length(3) word_length(5) dash_word(3) "
+        "upper(upper) epsilon [cache_file]"
     )
     eprint("-----------------------------------------------------")
     eprint("Parameter description:")
@@ -55,6 +56,10 @@ if len(sys.argv) < 9:
         "Should be set for case-sensitive languages e.g. German"
     )
     eprint("epsilon:\t\tsmoothing factor (recommended parameter: 0.01")
+    eprint(
+        "cache_file:\t\toptional SQLite file keeping the splits across runs, "
+        "shared with the other scripts"
+    )
     sys.exit(1)
 
 
@@ -75,9 +80,19 @@ file_wordcount = sys.argv[2]
 
 decompounder.prepare_decompounding(file_wordcount, file_knowledge)
 
+# the splits are only cached when a cache file is given, so that the memory used
+# does not grow with the input
+split = decompounder.split_compound
+if len(sys.argv) > 10:
+    decompounder.cache = PersistentSplitCache(
+        sys.argv[10], decompounder.fingerprint(file_wordcount, file_knowledge)
+    )
+    split = decompounder.split_word
+
 for l in sys.stdin:
     text = ""
     for w in l.strip().split():
-        pcand = decompounder.split_compound(w) or w
+        pcand = split(w) or w
         text += " " + pcand.replace("-", " ")
     print(text.strip())
+decompounder.cache.close()
@@ -0,0 +1,113 @@
+#! /usr/bin/env python3
+
+# Long-lived decompounding worker speaking newline-delimited JSON over stdin and
+# stdout, or over a Unix domain socket
+
+import argparse
+import logging
+import sys
+
+from secos import Splitter
+from secos.cache import PersistentSplitCache
+from secos.worker import Worker
+
+logging.basicConfig(
+    format="%(asctime)s : %(levelname)s : %(message)s", level=logging.INFO
+)
+
+
+parser = argparse.ArgumentParser(
+    description="Decompounding worker answering newline-delimited JSON requests "
+    'of the form {"id": ..., "tokens": [...]} with {"id": ..., "splits": [...]}, '
+    "over stdin and stdout or a Unix domain socket"
+)
+parser.add_argument(
+    "dt_candidates",
+    help="file with words and their split candidates, generated from a "
+    "distributional thesaurus (DT)",
+)
+parser.add_argument("word_count_file", help="file with word counts used for filtering")
+parser.add_argument(
+    "min_word_count",
+    type=int,
+    help="minimal word count used for split candidates (recommended paramater: 50)",
+)
+parser.add_argument(
+    "prefix_length",
+    type=int,
+    help="length of prefixes that are appended to the right-sided word "
+    "(recommended parameter: 3)",
+)
+parser.add_argument(
+    "suffix_length",
+    type=int,
+    help="length of suffixes that are appended to the left-sided word "
+    "(recommended parameter: 3)",
+)
+parser.add_argument(
+    "word_length",
+    type=int,
+    help="minimal word length that is used from the split candidates "
+    "(recommended parameter: 5)",
+)
+parser.add_argument(
+    "dash_word",
+    type=int,
+    choices=[1, 2, 3],
+    help="heuristic to split words with dash, which has no big impact "
+    "(recommended: 3)",
+)
+parser.add_argument(
+    "upper",
+    help="consider uppercase letters (=upper) or not (=lower). Should be set for "
+    "case-sensitive languages e.g. German",
+)
+parser.add_argument(
+    "epsilon", type=float, help="smoothing factor (recommended parameter: 0.01)"
+)
+parser.add_argument(
+    "cache_file",
+    nargs="?",
+    help="optional SQLite file keeping the splits across runs, shared with the "
+    "other scripts",
+)
+parser.add_argument(
+    "--socket",
+    metavar="PATH",
+    help="listen on this Unix domain socket instead of stdin and stdout",
+)
+parser.add_argument(
+    "--workers", type=int, default=4, help="number of threads splitting requests"
+)
+args = parser.parse_args()
+
+
+decompounder = Splitter(
+    min_word_count=args.min_word_count,
+    prefix_length=args.prefix_length,
+    suffix_length=args.suffix_length,
+    min_word_length=args.word_length,
+    # 1 -> remove, 2 -> split, 3 -> nothing
+    dash_words=Splitter.DashBehaviour(args.dash_word),
+    uppercase_first_letter=True if args.upper == "upper" else False,
+    epsilon=args.epsilon,
+)
+
+file_knowledge = args.dt_candidates
+file_wordcount = args.word_count_file
+
+decompounder.prepare_decompounding(file_wordcount, file_knowledge)
+
+if args.cache_file is not None:
+    decompounder.cache = PersistentSplitCache(
+        args.cache_file, decompounder.fingerprint(file_wordcount, file_knowledge)
+    )
+
+worker = Worker(decompounder, workers=args.workers)
+try:
+    if args.socket is not None:
+        worker.serve_unix(args.socket)
+    else:
+        worker.serve_stream(sys.stdin.buffer, sys.stdout.buffer)
+finally:
+    worker.close()
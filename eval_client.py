@@ -0,0 +1,199 @@
+#! /usr/bin/env python3
+
+# Check the synchronous and asynchronous clients against a local server instance,
+# and against the in-process splitter they fall back to
+
+import asyncio
+import logging
+import re
+import socket
+import sys
+import threading
+from typing import Any, List
+
+from secos import CompiledModel, Splitter
+from secos.client import AsyncClient, Client, ClientError
+from secos.registry import ModelRegistry
+from secos.server import DecompoundServer
+
+logging.basicConfig(
+    format="%(asctime)s : %(levelname)s : %(message)s", level=logging.WARNING
+)
+
+
+def eprint(*args, **kwargs) -> None:
+    print(*args, file=sys.stderr, **kwargs)
+
+
+if len(sys.argv) < 11:
+    eprint(
+        f"cat compound_file | python {sys.argv[0]} dt_candidates word_count_file "
+        "min_word_count(50) prefix_length(3) suffix_length(3) word_length(5) "
+        "dash_word(3) upper(upper) epsilon column_word [batch_size(16)]"
+    )
+    eprint("-----------------------------------------------------")
+    eprint("Parameter description:")
+    eprint("-----------------------------------------------------")
+    eprint(
+        "dt_candidates:\t\tfile with words and their split candidates, "
+        "generated from a distributional thesaurus (DT)"
+    )
+    eprint("word_count_file:\tfile with word counts used for filtering")
+    eprint(
+        "min_word_count:\t\tminimal word count used for split candidates "
+        "(recommended paramater: 50)"
+    )
+    eprint(
+        "prefix_length:\t\tlength of prefixes that are appended to the right-sided "
+        "word (recommended parameter: 3)"
+    )
+    eprint(
+        "suffix_length:\t\tlength of suffixes that are appended to the left-sided "
+        "word (recommended parameter: 3)"
+    )
+    eprint(
+        "word_length:\t\tminimal word length that is used from the split "
+        "candidates (recommended parameter: 5)"
+    )
+    eprint(
+        "dash_word:\t\theuristic to split words with dash, which has no big impact "
+        "(recommended: 3)"
+    )
+    eprint(
+        "upper:\t\t\tconsider uppercase letters (=upper) or not (=lower). "
+        "Should be set for case-sensitive languages e.g. German"
+    )
+    eprint("epsilon:\t\tsmoothing factor (recommended parameter: 0.01")
+    eprint("column_word:\t\tindex of the word in the tab separated compound_file")
+    eprint("batch_size:\t\tnumber of sentences sent by the clients in each request")
+    sys.exit(1)
+
+
+decompounder = Splitter(
+    min_word_count=int(sys.argv[3]),
+    prefix_length=int(sys.argv[4]),
+    suffix_length=int(sys.argv[5]),
+    min_word_length=int(sys.argv[6]),
+    # 1 -> remove, 2 -> split, 3 -> nothing
+    dash_words=Splitter.DashBehaviour(int(sys.argv[7])),
+    uppercase_first_letter=True if sys.argv[8] == "upper" else False,
+    epsilon=float(sys.argv[9]),
+)
+
+file_knowledge = sys.argv[1]
+file_wordcount = sys.argv[2]
+column_word = int(sys.argv[10])
+batch_size = int(sys.argv[11]) if len(sys.argv) > 11 else 16
+
+decompounder.prepare_decompounding(file_wordcount, file_knowledge)
+
+words = [l.rstrip("\n").split("\t")[column_word] for l in sys.stdin]
+# sentences of five words, so that they are sent in several batches
+sentences = [" ".join(words[i : i + 5]) for i in range(0, len(words), 5)]
+batches = -(-len(sentences) // batch_size)
+
+registry = ModelRegistry()
+registry.add_splitter("default", decompounder)
+server = DecompoundServer(("127.0.0.1", 0), registry, "default")
+url = f"http://127.0.0.1:{server.server_address[1]}"
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+# a port nothing listens on, for the clients to give up on
+with socket.socket() as s:
+    s.bind(("127.0.0.1", 0))
+    unreachable = f"http://127.0.0.1:{s.getsockname()[1]}"
+
+failed = False
+
+
+def check(name: str, ok: bool) -> None:
+    global failed
+    print(f"{name}\t{'OK' if ok else 'FAILED'}")
+    failed = failed or not ok
+
+
+def requests() -> int:
+    return registry.stats["default"].requests
+
+
+local = Client(splitter=decompounder)
+expected = local.decompound(sentences)
+expected_spans = local.spans(sentences)
+split = [
+    " ".join(decompounder.split_word(w).replace("-", " ") for w in s.split())
+    for s in sentences
+]
+check("local fallback", expected == split)
+
+
+def dashes(w: str) -> str:
+    """
+    Return w without its leading, trailing and repeated dashes.
+    """
+    return re.sub("-+", "-", w).strip("-")
+
+
+def insert_boundaries(w: str, start: int, boundaries: List[int]) -> str:
+    """
+    Return w, starting at start in the text, with a dash at each boundary.
+    """
+    cuts = [0] + [b - start for b in boundaries] + [len(w)]
+    return "-".join(w[i:j] for (i, j) in zip(cuts, cuts[1:]))
+
+
+# splits dropping or merging some of the dashes of the word
+check(
+    "span dashes",
+    CompiledModel._atom_boundaries("-Hausgarten", "Haus-garten") == [5]
+    and CompiledModel._atom_boundaries("Haus--Gartenzimmer", "Haus-Garten-zimmer")
+    == [12],
+)
+# inserting dashes at the boundaries gives back the split, also for words with a
+# leading dash
+dashed = [" ".join(f"-{w}" for w in s.split()) for s in sentences]
+check(
+    "span boundaries",
+    all(
+        dashes(insert_boundaries(text[start:end], start, boundaries))
+        == dashes(decompounder.split_word(text[start:end]))
+        for text in sentences + dashed
+        for (start, end, boundaries) in decompounder.split_spans(text)
+    ),
+)
+
+with Client(url, batch_size=batch_size) as client:
+    before = requests()
+    check("sync decompound", client.decompound(sentences) == expected)
+    check("sync batching", requests() - before == batches)
+    check("sync spans", client.spans(sentences) == expected_spans)
+try:
+    Client(unreachable, retries=2, backoff=0.01).decompound(sentences[:1])
+    check("sync retries", False)
+except ClientError:
+    check("sync retries", True)
+
+
+async def check_async() -> None:
+    async with AsyncClient(url, batch_size=batch_size) as client:
+        before = requests()
+        check("async decompound", await client.decompound(sentences) == expected)
+        check("async batching", requests() - before == batches)
+        check("async spans", await client.spans(sentences) == expected_spans)
+    async with AsyncClient(splitter=decompounder) as client:
+        res: List[Any] = await client.decompound(sentences)
+        check("async local fallback", res == expected)
+        res = await client.spans(sentences)
+        check("async local spans", res == expected_spans)
+    try:
+        await AsyncClient(unreachable, retries=2, backoff=0.01).decompound(
+            sentences[:1]
+        )
+        check("async retries", False)
+    except ClientError:
+        check("async retries", True)
+
+
+asyncio.run(check_async())
+server.shutdown()
+server.server_close()
+sys.exit(1 if failed else 0)
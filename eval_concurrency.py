@@ -0,0 +1,213 @@
+#! /usr/bin/env python3
+
+# Stress the splitter with concurrent queries while its data is reloaded, checking
+# them against serial ones
+
+import logging
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Set, Tuple
+
+from secos import CompiledModel, Splitter
+from secos.cache import SplitCache
+
+logging.basicConfig(
+    format="%(asctime)s : %(levelname)s : %(message)s", level=logging.INFO
+)
+
+
+def eprint(*args, **kwargs) -> None:
+    print(*args, file=sys.stderr, **kwargs)
+
+
+if len(sys.argv) < 11:
+    eprint(
+        f"cat compound_file | python {sys.argv[0]} dt_candidates word_count_file "
+        "min_word_count(50) prefix_length(3) suffix_length(3) word_length(5) "
+        "dash_word(3) upper(upper) epsilon column_word [threads(8)] [rounds(4)] "
+        "[reloads(2)]"
+    )
+    eprint("-----------------------------------------------------")
+    eprint("Parameter description:")
+    eprint("-----------------------------------------------------")
+    eprint(
+        "dt_candidates:\t\tfile with words and their split candidates, "
+        "generated from a distributional thesaurus (DT)"
+    )
+    eprint("word_count_file:\tfile with word counts used for filtering")
+    eprint(
+        "min_word_count:\t\tminimal word count used for split candidates "
+        "(recommended paramater: 50)"
+    )
+    eprint(
+        "prefix_length:\t\tlength of prefixes that are appended to the right-sided "
+        "word (recommended parameter: 3)"
+    )
+    eprint(
+        "suffix_length:\t\tlength of suffixes that are appended to the left-sided "
+        "word (recommended parameter: 3)"
+    )
+    eprint(
+        "word_length:\t\tminimal word length that is used from the split "
+        "candidates (recommended parameter: 5)"
+    )
+    eprint(
+        "dash_word:\t\theuristic to split words with dash, which has no big impact "
+        "(recommended: 3)"
+    )
+    eprint(
+        "upper:\t\t\tconsider uppercase letters (=upper) or not (=lower). "
+        "Should be set for case-sensitive languages e.g. German"
+    )
+    eprint("epsilon:\t\tsmoothing factor (recommended parameter: 0.01")
+    eprint("column_word:\t\tindex of the word in the tab separated compound_file")
+    eprint("threads:\t\tnumber of threads querying the splitter concurrently")
+    eprint("rounds:\t\t\tminimal number of times each thread queries every word")
+    eprint(
+        "reloads:\t\tnumber of times the candidates, single words and word counts "
+        "are read under load"
+    )
+    sys.exit(1)
+
+
+file_knowledge = sys.argv[1]
+file_wordcount = sys.argv[2]
+column_word = int(sys.argv[10])
+threads = int(sys.argv[11]) if len(sys.argv) > 11 else 8
+rounds = int(sys.argv[12]) if len(sys.argv) > 12 else 4
+reloads = int(sys.argv[13]) if len(sys.argv) > 13 else 2
+
+words = [l.rstrip("\n").split("\t")[column_word] for l in sys.stdin]
+
+
+def load(engine: Splitter.Engine) -> Splitter:
+    """
+    Return a splitter with only the word counts loaded, the candidates being read
+    under load.
+    """
+    splitter = Splitter(
+        min_word_count=int(sys.argv[3]),
+        prefix_length=int(sys.argv[4]),
+        suffix_length=int(sys.argv[5]),
+        min_word_length=int(sys.argv[6]),
+        # 1 -> remove, 2 -> split, 3 -> nothing
+        dash_words=Splitter.DashBehaviour(int(sys.argv[7])),
+        uppercase_first_letter=True if sys.argv[8] == "upper" else False,
+        epsilon=float(sys.argv[9]),
+        engine=engine,
+    )
+    splitter.read_word_count(file_wordcount)
+    return splitter
+
+
+def operations(splitter: Splitter) -> List[Callable[[], None]]:
+    """
+    Return the loads of the data of splitter done under load, in order. Since the
+    word counts are added to the loaded ones, reading them again changes the splits.
+    """
+    return [
+        lambda: splitter.read_knowledge(file_knowledge),
+        splitter.extract_single_words,
+        lambda: splitter.read_word_count(file_wordcount),
+    ] * reloads
+
+
+def shape(model: CompiledModel) -> Tuple[int, ...]:
+    """
+    Return the sizes of the containers of model, which must never change.
+    """
+    return (
+        len(model.comp1),
+        len(model.comp2),
+        len(model.comp3),
+        len(model._part_count),
+        len(model._folded_single_words),
+    )
+
+
+def query(
+    splitter: Splitter, expected: Dict[str, Set[str]], done: threading.Event, seed: int
+) -> Tuple[List[str], Dict[int, CompiledModel]]:
+    """
+    Split all words in a random order, at least rounds times and until done is set,
+    returning the ones whose split is not the one of any state of the data, and the
+    compiled models used, by id, the ones changed after being compiled being counted
+    in mutated.
+    """
+    rng = random.Random(seed)
+    order = list(words)
+    mismatches = []
+    models: Dict[int, Tuple[CompiledModel, Tuple[int, ...]]] = {}
+    i = 0
+    while i < rounds or not done.is_set():
+        rng.shuffle(order)
+        for w in order:
+            model = splitter.compile()
+            if id(model) not in models:
+                models[id(model)] = (model, shape(model))
+            if model.split_word(w) not in expected[w]:
+                mismatches.append(w)
+        queries[seed] += len(order)
+        i += 1
+    for model, sizes in models.values():
+        if shape(model) != sizes:
+            mutated[seed] += 1
+    return (mismatches, {key: model for (key, (model, __)) in models.items()})
+
+
+failed = False
+print("Engine\tThreads\tQueries\tMismatches\tModels\tMutated\tLoads\tSeconds")
+for engine in Splitter.Engine:
+    decompounder = load(engine)
+    # the splits of every state the data goes through, replaying the loads
+    replica = load(engine)
+    expected: Dict[str, Set[str]] = {w: set() for w in words}
+    for operation in [lambda: None] + operations(replica):
+        operation()
+        model = replica.compile()
+        for w in words:
+            expected[w].add(model.split_compound(w) or w)
+    done = threading.Event()
+    queries = [0] * threads
+    mutated = [0] * threads
+
+    def reload() -> None:
+        """
+        Run the loads while the queries run, replacing the cache before each of
+        them, so that the model is compiled again and again under load.
+        """
+        for operation in operations(decompounder):
+            decompounder.cache = SplitCache()
+            time.sleep(0.01)
+            operation()
+        done.set()
+
+    reloader = threading.Thread(target=reload)
+    start = time.monotonic()
+    reloader.start()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(
+            pool.map(
+                query,
+                [decompounder] * threads,
+                [expected] * threads,
+                [done] * threads,
+                range(threads),
+            )
+        )
+    reloader.join()
+    elapsed = time.monotonic() - start
+    mismatches = [w for (ws, __) in results for w in ws]
+    models = {key for (__, ms) in results for key in ms}
+    print(
+        f"{engine.name}\t{threads}\t{sum(queries)}\t{len(mismatches)}\t"
+        f"{len(models)}\t{sum(mutated)}\t{len(operations(decompounder))}\t"
+        f"{elapsed:.2f}"
+    )
+    for w in sorted(set(mismatches))[:10]:
+        eprint(f"mismatch: {w}\t{decompounder.split_word(w)}\t{sorted(expected[w])}")
+    failed = failed or bool(mismatches) or sum(mutated) > 0
+sys.exit(1 if failed else 0)
@@ -0,0 +1,60 @@
+#! /usr/bin/env python3
+
+# Use a testing dataset containing compound words to compare any number of methods,
+# reporting the significance of the differences between each pair of them
+
+import argparse
+from typing import Tuple
+
+from secos.eval import NWayEvaluator
+
+parser = argparse.ArgumentParser(
+    description="Evaluate several methods for compound splitting against the same "
+    "gold standard, with pairwise Wilcoxon and McNemar tests and optional bootstrap "
+    "confidence intervals"
+)
+parser.add_argument("gold_file", help="tab separated file with the gold standard")
+parser.add_argument(
+    "column_gold", type=int, help="index of the gold split in the gold_file"
+)
+parser.add_argument(
+    "systems",
+    nargs="+",
+    metavar="compound_file:column_predicted",
+    help="tab separated file with the predicted splits of a method, in the same "
+    "order as the gold_file, and the index of the column of the prediction",
+)
+parser.add_argument(
+    "--bootstrap",
+    type=int,
+    default=0,
+    metavar="N",
+    help="compute paired bootstrap confidence intervals of the mean F1 with N "
+    "resamples",
+)
+parser.add_argument(
+    "--confidence", type=float, default=0.95, help="level of the confidence intervals"
+)
+parser.add_argument("--seed", type=int, help="seed of the bootstrap resampling")
+args = parser.parse_args()
+
+
+def parse_system(s: str) -> Tuple[str, int]:
+    (f, __, col) = s.rpartition(":")
+    if not f or not col.isdigit():
+        parser.error(f"expected compound_file:column_predicted, got {s}")
+    return (f, int(col))
+
+
+evaluator = NWayEvaluator(
+    gold_file=args.gold_file,
+    col_gold=args.column_gold,
+    systems=[parse_system(s) for s in args.systems],
+    bootstrap=args.bootstrap,
+    confidence=args.confidence,
+    seed=args.seed,
+)
+try:
+    evaluator.evaluate()
+except NWayEvaluator.InputError as e:  # When files are not the same length
+    parser.exit(1, f"{e}\n")
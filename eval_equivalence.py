@@ -0,0 +1,133 @@
+#! /usr/bin/env python3
+
+# Check that alternative splitter engines split words exactly as the reference one,
+# comparing their latency and memory use
+
+import argparse
+import logging
+import sys
+
+from secos import Splitter
+from secos.eval import EquivalenceEvaluator
+from secos.eval.equivalence import ENGINES
+
+logging.basicConfig(
+    format="%(asctime)s : %(levelname)s : %(message)s", level=logging.WARNING
+)
+
+
+parser = argparse.ArgumentParser(
+    description="Run the reference splitter and alternative engines side by side on "
+    "a corpus of words, reporting the words they split differently and their "
+    "latency and memory use. Exits with status 1 if any word is split differently "
+    "or an engine misses the speed budget."
+)
+parser.add_argument(
+    "dt_candidates",
+    help="file with words and their split candidates, generated from a "
+    "distributional thesaurus (DT)",
+)
+parser.add_argument("word_count_file", help="file with word counts used for filtering")
+parser.add_argument(
+    "min_word_count",
+    type=int,
+    help="minimal word count used for split candidates (recommended paramater: 50)",
+)
+parser.add_argument(
+    "prefix_length",
+    type=int,
+    help="length of prefixes that are appended to the right-sided word "
+    "(recommended parameter: 3)",
+)
+parser.add_argument(
+    "suffix_length",
+    type=int,
+    help="length of suffixes that are appended to the left-sided word "
+    "(recommended parameter: 3)",
+)
+parser.add_argument(
+    "word_length",
+    type=int,
+    help="minimal word length that is used from the split candidates "
+    "(recommended parameter: 5)",
+)
+parser.add_argument(
+    "dash_word",
+    type=int,
+    choices=[1, 2, 3],
+    help="heuristic to split words with dash, which has no big impact "
+    "(recommended: 3)",
+)
+parser.add_argument(
+    "upper",
+    help="consider uppercase letters (=upper) or not (=lower). Should be set for "
+    "case-sensitive languages e.g. German",
+)
+parser.add_argument(
+    "epsilon", type=float, help="smoothing factor (recommended parameter: 0.01)"
+)
+parser.add_argument(
+    "--engines",
+    default="compiled,cached,model",
+    help="comma separated engines compared to the reference one, among "
+    f"{', '.join(e for e in ENGINES if e != 'reference')}",
+)
+parser.add_argument(
+    "--corpus",
+    metavar="FILE",
+    help="tab separated file with the words to split, instead of a synthetic corpus",
+)
+parser.add_argument(
+    "--column", type=int, default=0, help="index of the word in the corpus file"
+)
+parser.add_argument(
+    "--synthetic",
+    type=int,
+    default=100000,
+    metavar="N",
+    help="number of words of the synthetic corpus",
+)
+parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic corpus")
+parser.add_argument(
+    "--max-slowdown",
+    type=float,
+    default=0.0,
+    help="fail if the mean latency of an engine exceeds this multiple of the "
+    "reference one (0 to disable)",
+)
+args = parser.parse_args()
+
+engines = [e for e in args.engines.split(",") if e]
+for e in engines:
+    if e not in ENGINES:
+        parser.error(f"unknown engine {e}")
+
+decompounder = Splitter(
+    min_word_count=args.min_word_count,
+    prefix_length=args.prefix_length,
+    suffix_length=args.suffix_length,
+    min_word_length=args.word_length,
+    # 1 -> remove, 2 -> split, 3 -> nothing
+    dash_words=Splitter.DashBehaviour(args.dash_word),
+    uppercase_first_letter=True if args.upper == "upper" else False,
+    epsilon=args.epsilon,
+)
+
+words = None
+if args.corpus is not None:
+    with open(args.corpus) as f:
+        words = [l.rstrip("\n").split("\t")[args.column] for l in f if l.strip()]
+
+evaluator = EquivalenceEvaluator(
+    decompounder,
+    args.word_count_file,
+    args.dt_candidates,
+    engines=engines,
+    words=words,
+    synthetic_words=args.synthetic,
+    seed=args.seed,
+    max_slowdown=args.max_slowdown,
+)
+evaluator.evaluate()
+if not evaluator.passed:
+    sys.exit(1)
@@ -0,0 +1,51 @@
+#! /usr/bin/env python3
+
+# Check that importing the splitter stays fast, without loading the dependencies of
+# the evaluation (numpy, scipy)
+
+import subprocess
+import sys
+
+# modules which must not be imported by the splitter
+FORBIDDEN = ("numpy", "scipy", "secos.eval")
+
+
+def eprint(*args, **kwargs) -> None:
+    print(*args, file=sys.stderr, **kwargs)
+
+
+if len(sys.argv) > 1 and not sys.argv[1].replace(".", "").isdigit():
+    eprint(f"python {sys.argv[0]} [max_milliseconds(200)]")
+    eprint("-----------------------------------------------------")
+    eprint("Parameter description:")
+    eprint("-----------------------------------------------------")
+    eprint("max_milliseconds:\tfailure threshold of the time to import secos")
+    sys.exit(1)
+
+budget = float(sys.argv[1]) if len(sys.argv) > 1 else 200.0
+code = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import secos\n"
+    "secos.Splitter\n"
+    "print((time.perf_counter() - start) * 1000)\n"
+    "print(' '.join(sys.modules))\n"
+)
+# a fresh interpreter, so that nothing is imported yet
+res = subprocess.run(
+    [sys.executable, "-c", code], capture_output=True, text=True, check=True
+)
+(elapsed, modules) = res.stdout.splitlines()
+loaded = [
+    f
+    for f in FORBIDDEN
+    if any(m == f or m.startswith(f"{f}.") for m in modules.split())
+]
+print(f"import secos: {float(elapsed):.1f}ms (budget {budget:.0f}ms)")
+if loaded:
+    print(f"FAILED: imported {', '.join(loaded)}")
+    sys.exit(1)
+if float(elapsed) > budget:
+    print("FAILED: over budget")
+    sys.exit(1)
+print("OK")
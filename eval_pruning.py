@@ -0,0 +1,95 @@
+#! /usr/bin/env python3
+
+# Compare the memory used and the accuracy of a model with different vocabulary
+# pruning settings on a gold standard
+
+import logging
+import sys
+
+from secos import Splitter
+from secos.eval import PruningEvaluator
+
+logging.basicConfig(
+    format="%(asctime)s : %(levelname)s : %(message)s", level=logging.INFO
+)
+
+
+def eprint(*args, **kwargs) -> None:
+    print(*args, file=sys.stderr, **kwargs)
+
+
+if len(sys.argv) < 13:
+    eprint(
+        f"cat compound_file | python {sys.argv[0]} dt_candidates word_count_file "
+        "min_word_count(50) prefix_length(3) suffix_length(3) word_length(5) "
+        "dash_word(3) upper(upper) epsilon column_word column_gold_compound "
+        "min_counts [max_bytes]"
+    )
+    eprint("-----------------------------------------------------")
+    eprint("Parameter description:")
+    eprint("-----------------------------------------------------")
+    eprint(
+        "dt_candidates:\t\tfile with words and their split candidates, "
+        "generated from a distributional thesaurus (DT)"
+    )
+    eprint("word_count_file:\tfile with word counts used for filtering")
+    eprint(
+        "min_word_count:\t\tminimal word count used for split candidates "
+        "(recommended paramater: 50)"
+    )
+    eprint(
+        "prefix_length:\t\tlength of prefixes that are appended to the right-sided "
+        "word (recommended parameter: 3)"
+    )
+    eprint(
+        "suffix_length:\t\tlength of suffixes that are appended to the left-sided "
+        "word (recommended parameter: 3)"
+    )
+    eprint(
+        "word_length:\t\tminimal word length that is used from the split "
+        "candidates (recommended parameter: 5)"
+    )
+    eprint(
+        "dash_word:\t\theuristic to split words with dash, which has no big impact "
+        "(recommended: 3)"
+    )
+    eprint(
+        "upper:\t\t\tconsider uppercase letters (=upper) or not (=lower). "
+        "Should be set for case-sensitive languages e.g. German"
+    )
+    eprint("epsilon:\t\tsmoothing factor (recommended parameter: 0.01")
+    eprint("column_word:\t\tindex of the word in the tab separated compound_file")
+    eprint("column_gold_compound:\tindex of the gold split in the compound_file")
+    eprint("min_counts:\t\tcomma-separated minimal counts of the words kept")
+    eprint("max_bytes:\t\tcomma-separated memory caps of the word counts, in bytes")
+    sys.exit(1)
+
+
+decompounder = Splitter(
+    min_word_count=int(sys.argv[3]),
+    prefix_length=int(sys.argv[4]),
+    suffix_length=int(sys.argv[5]),
+    min_word_length=int(sys.argv[6]),
+    # 1 -> remove, 2 -> split, 3 -> nothing
+    dash_words=Splitter.DashBehaviour(int(sys.argv[7])),
+    uppercase_first_letter=True if sys.argv[8] == "upper" else False,
+    epsilon=float(sys.argv[9]),
+)
+
+
+file_knowledge = sys.argv[1]
+file_wordcount = sys.argv[2]
+
+settings = [(int(c), 0) for c in sys.argv[12].split(",") if c]
+if len(sys.argv) > 13:
+    settings += [(0, int(b)) for b in sys.argv[13].split(",") if b]
+
+evaluator = PruningEvaluator(
+    decompounder,
+    file_count=file_wordcount,
+    file_knowledge=file_knowledge,
+    col_word=int(sys.argv[10]),
+    col_gold=int(sys.argv[11]),
+    settings=settings,
+)
+evaluator.evaluate()
@@ -0,0 +1,91 @@
+#! /usr/bin/env python3
+
+# Compare the memory used by the distributional thesaurus of the Trainer to a
+# dictionary of neighbour lists, on a synthetic thesaurus
+
+import io
+import random
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, List, TextIO, Tuple
+
+from secos import Trainer
+
+
+def eprint(*args, **kwargs) -> None:
+    print(*args, file=sys.stderr, **kwargs)
+
+
+if len(sys.argv) > 1 and not sys.argv[1].isdigit():
+    eprint(f"python {sys.argv[0]} [words(20000)] [neighbours(100)]")
+    eprint("-----------------------------------------------------")
+    eprint("Parameter description:")
+    eprint("-----------------------------------------------------")
+    eprint("words:\t\t\tnumber of words of the synthetic thesaurus")
+    eprint("neighbours:\t\tnumber of neighbours of each word")
+    sys.exit(1)
+
+
+def synthetic_dt(words: int, neighbours: int) -> str:
+    """
+    Return a thesaurus of random compounds, each having the given number of
+    neighbours.
+    """
+    rng = random.Random(0)
+    syllables = ["bahn", "hof", "weizen", "bier", "haus", "tür", "fenster", "zug"]
+    vocabulary = sorted(
+        {
+            "".join(rng.choices(syllables, k=rng.randint(1, 4))).capitalize()
+            + str(rng.randrange(words))
+            for __ in range(words)
+        }
+    )
+    return "".join(
+        f"{w1}\t{w2}\t{rng.random():.3f}\n"
+        for w1 in vocabulary
+        for w2 in rng.sample(vocabulary, neighbours)
+    )
+
+
+def read_lists(dt: TextIO) -> Dict[str, List[str]]:
+    """
+    Read the thesaurus into a dictionary of neighbour lists.
+    """
+    res: Dict[str, List[str]] = {}
+    for l in dt:
+        ls = l.strip().split("\t")
+        res.setdefault(ls[0], []).append(ls[1])
+    return res
+
+
+def read_trainer(dt: TextIO) -> Trainer:
+    """
+    Read the thesaurus into a Trainer.
+    """
+    trainer = Trainer(input=dt)
+    trainer._read_input()
+    return trainer
+
+
+def measure(read: Callable[[TextIO], Any], dt: str) -> Tuple[int, int]:
+    """
+    Return the memory retained by the result of read and the peak memory used while
+    reading, not counting the input itself.
+    """
+    f = io.StringIO(dt)
+    tracemalloc.start()
+    res = read(f)
+    (current, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del res
+    return (current, peak)
+
+
+words = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+neighbours = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+dt = synthetic_dt(words, neighbours)
+print(f"{dt.count(chr(10))} lines")
+print("Representation\tRetained(MB)\tPeak(MB)")
+for (name, read) in (("lists", read_lists), ("trainer", read_trainer)):
+    (current, peak) = measure(read, dt)
+    print(f"{name}\t{current / 2 ** 20:.1f}\t{peak / 2 ** 20:.1f}")
@@ -1,4 +1,17 @@
-import secos.eval
+import importlib
+from typing import TYPE_CHECKING, Any
 
-from .decompound import Splitter
+from .decompound import CompiledModel, Splitter
 from .train import Trainer
+
+if TYPE_CHECKING:
+    from . import eval
+
+# subpackages imported on first access, since they pull in heavy dependencies
+_LAZY_SUBMODULES = ("eval",)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
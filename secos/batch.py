@@ -0,0 +1,161 @@
+# Resumable batch processing of large files, in numbered chunks
+
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+def _write_atomically(path: str, write: Callable[[Any], None], mode: str = "w") -> None:
+    """
+    Write a file using write, replacing path only once it is entirely on disk.
+    """
+    tmp = f"{path}.tmp"
+    with open(tmp, mode, encoding=None if "b" in mode else "utf-8") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+@dataclass
+class ChunkedBatch:
+    """
+    Apply process to every line of input, writing the resulting lines to output.
+    process is given each line with its line ending, and returns the output line
+    without it.
+
+    The input is processed in numbered chunks of chunk_size lines, the output of
+    each chunk being written atomically to the work directory (output.chunks by
+    default) along with a manifest of the completed chunks. A run interrupted at
+    any point resumes after the last completed chunk, as long as the input and the
+    key (e.g: `Splitter.fingerprint`, identifying the processing) are unchanged.
+    Once all chunks are done, they are concatenated in order into output and the
+    work directory is removed.
+    """
+
+    input: str
+    output: str
+    process: Callable[[str], str]
+    chunk_size: int = 100000
+    key: str = ""
+    work_dir: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.work_dir is None:
+            self.work_dir = f"{self.output}.chunks"
+
+    def _path(self, name: str) -> str:
+        assert self.work_dir is not None
+        return os.path.join(self.work_dir, name)
+
+    def _identity(self) -> Dict[str, Any]:
+        """
+        Return what identifies the run a manifest belongs to.
+        """
+        st = os.stat(self.input)
+        return {
+            "input": os.path.abspath(self.input),
+            "input_size": st.st_size,
+            "input_mtime_ns": st.st_mtime_ns,
+            "chunk_size": self.chunk_size,
+            "key": self.key,
+        }
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """
+        Return the manifest of the previous run if it can be resumed, or a new one.
+        """
+        identity = self._identity()
+        try:
+            with open(self._path("manifest.json")) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            manifest = None
+        except ValueError:
+            logging.warning(f"{self.work_dir}: unreadable manifest, starting over")
+            manifest = None
+        if manifest is not None and manifest["identity"] != identity:
+            logging.warning(f"{self.work_dir}: input or key changed, starting over")
+            manifest = None
+        if manifest is None:
+            assert self.work_dir is not None
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            os.makedirs(self.work_dir)
+            manifest = {"identity": identity, "chunks": []}
+            self._save_manifest(manifest)
+        return manifest
+
+    def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+        _write_atomically(
+            self._path("manifest.json"), lambda f: json.dump(manifest, f, indent=1)
+        )
+
+    def _chunks(self, offset: int) -> Iterator[Tuple[List[str], int]]:
+        """
+        Yield the lines of each chunk of the input starting at the byte offset, with
+        the offset of the end of the chunk.
+        """
+        with open(self.input, "rb") as f:
+            f.seek(offset)
+            lines: List[str] = []
+            for l in f:
+                offset += len(l)
+                lines.append(l.decode("utf-8"))
+                if len(lines) == self.chunk_size:
+                    yield (lines, offset)
+                    lines = []
+            if lines:
+                yield (lines, offset)
+
+    def _concatenate(self, manifest: Dict[str, Any]) -> None:
+        """
+        Write the outputs of all chunks, in order, to the output file.
+        """
+
+        def write(out: Any) -> None:
+            for chunk in manifest["chunks"]:
+                with open(self._path(chunk["file"]), "rb") as f:
+                    shutil.copyfileobj(f, out)
+
+        _write_atomically(self.output, write, "wb")
+
+    def run(self) -> None:
+        """
+        Process the remaining chunks of the input, then write the output.
+        """
+        manifest = self._load_manifest()
+        chunks = manifest["chunks"]
+        offset = chunks[-1]["end"] if chunks else 0
+        lines_done = sum(c["lines"] for c in chunks)
+        if chunks:
+            logging.info(f"resuming after chunk {len(chunks) - 1} ({lines_done} lines)")
+        total = manifest["identity"]["input_size"]
+        start_offset = offset
+        start_time = time.monotonic()
+        lines_run = 0
+        for (lines, end) in self._chunks(offset):
+            index = len(chunks)
+            name = f"chunk-{index:06d}.out"
+            _write_atomically(
+                self._path(name),
+                lambda f: f.writelines(f"{self.process(l)}\n" for l in lines),
+            )
+            chunks.append({"file": name, "lines": len(lines), "end": end})
+            self._save_manifest(manifest)
+            lines_done += len(lines)
+            lines_run += len(lines)
+            # the ETA is estimated from the bytes of input processed by this run
+            elapsed = max(time.monotonic() - start_time, 1e-9)
+            eta = (total - end) * elapsed / max(end - start_offset, 1)
+            logging.info(
+                f"chunk {index} done: {lines_done} lines, {end / max(total, 1):.1%} of "
+                f"the input, {lines_run / elapsed:.0f} lines/s, ETA {eta:.0f}s"
+            )
+        self._concatenate(manifest)
+        assert self.work_dir is not None
+        shutil.rmtree(self.work_dir)
+        logging.info(f"{self.output}: {lines_done} lines written")
@@ -0,0 +1,206 @@
+import logging
+import queue
+import sqlite3
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# approximate size of an entry of a dict, besides its key and value
+_DICT_ENTRY_SIZE = 40
+
+
+class SplitCache:
+    """
+    In-memory cache of the split computed for each word, keeping at most max_size
+    words (0 meaning no limit), the least recently added ones being dropped first.
+    The approximate number of bytes used by the words and their splits is kept in
+    size.
+
+    The cache is cleared when the model computing the splits changes. Each clearing
+    starts a new generation, so that the splits computed meanwhile by the previous
+    model are not kept.
+    """
+
+    def __init__(self, max_size: int = 0) -> None:
+        self.max_size = max_size
+        self.words: Dict[str, str] = {}
+        self.size = 0
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, w: str) -> Optional[str]:
+        """
+        Return the cached split of w, or None if it is unknown.
+        """
+        return self.words.get(w)
+
+    def put(self, w: str, split: str, generation: Optional[int] = None) -> None:
+        """
+        Remember split as the split of w, unless it was computed for a generation
+        of the cache other than the current one.
+        """
+        self._remember(w, split, generation)
+
+    def _remember(self, w: str, split: str, generation: Optional[int] = None) -> bool:
+        """
+        See `put`, returning whether split was remembered.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            old = self.words.get(w)
+            if old is not None:
+                self.size -= self._entry_size(w, old)
+            self.words[w] = split
+            self.size += self._entry_size(w, split)
+            while 0 < self.max_size < len(self.words):
+                # dicts keep the insertion order, the oldest word comes first
+                oldest = next(iter(self.words))
+                self.size -= self._entry_size(oldest, self.words.pop(oldest))
+        return True
+
+    @staticmethod
+    def _entry_size(w: str, split: str) -> int:
+        """
+        Return the approximate number of bytes used by the split of a word.
+        """
+        return sys.getsizeof(w) + sys.getsizeof(split) + _DICT_ENTRY_SIZE
+
+    def clear(self) -> None:
+        """
+        Forget the cached splits, computed by a model which changed since, and
+        start a new generation.
+        """
+        with self._lock:
+            self.words = {}
+            self.size = 0
+            self.generation += 1
+
+    def close(self) -> None:
+        """
+        Release the resources held by the cache.
+        """
+        pass
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+
+class PersistentSplitCache(SplitCache):
+    """
+    Cache reading through to an SQLite database, keyed by word and by a fingerprint
+    of the model and its parameters (see `Splitter.fingerprint`).
+
+    New splits are written back to the database by a background thread, in batches
+    of at most flush_size. The database can be shared by several processes on the
+    same host, e.g: the server and the batch scripts. Since it holds all the splits,
+    only max_size of them are kept in memory.
+
+    Once cleared, the fingerprint no longer identifies the model computing the
+    splits, so the database is not used anymore.
+    """
+
+    _STOP = ("", "")
+
+    def __init__(
+        self,
+        path: str,
+        fingerprint: str,
+        flush_size: int = 1000,
+        max_size: int = 100000,
+    ) -> None:
+        super().__init__(max_size)
+        self.path = path
+        self.fingerprint = fingerprint
+        self.flush_size = flush_size
+        self.detached = False
+        self._local = threading.local()
+        conn = self._connect()
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS splits (fingerprint TEXT, word TEXT, "
+                "split TEXT, PRIMARY KEY (fingerprint, word)) WITHOUT ROWID"
+            )
+        self._pending: "queue.Queue[Tuple[str, str]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_back, daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Return the connection to the database of the calling thread.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def _write_back(self) -> None:
+        """
+        Write the pending splits to the database until the cache is closed.
+        """
+        conn = self._connect()
+        stop = False
+        while not stop:
+            batch: List[Tuple[str, str, str]] = []
+            item = self._pending.get()
+            while True:
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append((self.fingerprint, *item))
+                if len(batch) >= self.flush_size:
+                    break
+                try:
+                    item = self._pending.get_nowait()
+                except queue.Empty:
+                    break
+            if not batch:
+                continue
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO splits VALUES (?, ?, ?)", batch
+                    )
+            except sqlite3.Error as e:
+                logging.warning(f"{self.path}: could not write splits: {e}")
+        conn.close()
+
+    def get(self, w: str) -> Optional[str]:
+        res = super().get(w)
+        if res is not None or self.detached:
+            return res
+        row = (
+            self._connect()
+            .execute(
+                "SELECT split FROM splits WHERE fingerprint = ? AND word = ?",
+                (self.fingerprint, w),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        self._remember(w, row[0])
+        return row[0]
+
+    def put(self, w: str, split: str, generation: Optional[int] = None) -> None:
+        if self._remember(w, split, generation) and not self.detached:
+            self._pending.put((w, split))
+
+    def clear(self) -> None:
+        super().clear()
+        if not self.detached:
+            logging.warning(
+                f"{self.path}: the model changed, its splits are no longer read from "
+                "nor written to the database"
+            )
+            self.detached = True
+
+    def close(self) -> None:
+        """
+        Write all pending splits to the database and stop the writing thread.
+        """
+        if self._writer.is_alive():
+            self._pending.put(self._STOP)
+            self._writer.join()
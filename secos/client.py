@@ -0,0 +1,321 @@
+# Clients for the decompounding server, falling back to an in-process Splitter
+
+import asyncio
+import http.client
+import json
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .decompound import Span, Splitter
+from .server import decompound_sentence
+
+
+class ClientError(RuntimeError):
+    """
+    Error raised when the server rejects a request, or is still unreachable after
+    all retries.
+    """
+
+    pass
+
+
+class _TransientError(Exception):
+    """
+    Error worth retrying the request for.
+    """
+
+    pass
+
+
+def _batches(sentences: List[str], size: int) -> List[List[str]]:
+    """
+    Cut the list of sentences into batches of at most size sentences.
+    """
+    return [sentences[i : i + size] for i in range(0, len(sentences), size)]
+
+
+def _check_response(status: int, body: bytes, spans: bool) -> List[Any]:
+    """
+    Return the decompounded sentences or their spans from a response, raising
+    _TransientError on server errors and ClientError on rejected requests.
+    """
+    if status >= 500:
+        raise _TransientError(f"server error {status}")
+    if status != 200:
+        raise ClientError(f"request rejected with status {status}: {body!r}")
+    res = json.loads(body)
+    if spans:
+        return [[(start, end, b) for (start, end, b) in s] for s in res["spans"]]
+    return res["sentences"]
+
+
+@dataclass
+class _BaseClient:
+    """
+    Parameters shared by the synchronous and asynchronous clients.
+
+    When url is None, sentences are decompounded in-process using splitter.
+    Otherwise, the server uses the given model, or its default one.
+    """
+
+    url: Optional[str] = None
+    splitter: Optional[Splitter] = None
+    pool_size: int = 4
+    batch_size: int = 256
+    retries: int = 3
+    backoff: float = 0.1
+    timeout: float = 30.0
+    model: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.url is None and self.splitter is None:
+            raise ValueError("Either a server url or a splitter is needed")
+
+    def _address(self) -> Tuple[str, int]:
+        assert self.url is not None
+        parsed = urlparse(self.url if "//" in self.url else f"//{self.url}")
+        return (parsed.hostname or "localhost", parsed.port or 80)
+
+    def _body(self, batch: List[str], spans: bool) -> bytes:
+        query: Dict[str, Any] = {"sentences": batch}
+        if self.model is not None:
+            query["model"] = self.model
+        if spans:
+            query["format"] = "spans"
+        return json.dumps(query).encode()
+
+    def _decompound_locally(self, sentences: List[str], spans: bool) -> List[Any]:
+        assert self.splitter is not None
+        if spans:
+            return [list(self.splitter.split_spans(s)) for s in sentences]
+        return [decompound_sentence(self.splitter, s) for s in sentences]
+
+
+@dataclass
+class Client(_BaseClient):
+    """
+    Synchronous client for the decompounding server, keeping a pool of persistent
+    connections and sending sentences in batches. It can be shared between threads.
+    """
+
+    _pool: "queue.LifoQueue[http.client.HTTPConnection]" = field(
+        default_factory=queue.LifoQueue, init=False, repr=False
+    )
+    _slots: threading.BoundedSemaphore = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close all pooled connections.
+        """
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    def _request(self, batch: List[str], spans: bool) -> List[Any]:
+        with self._slots:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                host, port = self._address()
+                conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+            try:
+                conn.request(
+                    "POST",
+                    "/",
+                    body=self._body(batch, spans),
+                    headers={"Content-Type": "application/json"},
+                )
+                resp = conn.getresponse()
+                body = resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                # the other pooled connections are likely stale as well
+                conn.close()
+                self.close()
+                raise _TransientError(e)
+            if resp.will_close:
+                conn.close()
+            else:
+                self._pool.put(conn)
+            return _check_response(resp.status, body, spans)
+
+    def _request_with_retries(self, batch: List[str], spans: bool) -> List[Any]:
+        for attempt in range(self.retries + 1):
+            try:
+                return self._request(batch, spans)
+            except _TransientError as e:
+                logging.info(f"attempt {attempt + 1} failed: {e}")
+                if attempt < self.retries:
+                    time.sleep(self.backoff * 2**attempt)
+        raise ClientError(f"server {self.url} unreachable")
+
+    def _decompound(self, sentences: Iterable[str], spans: bool) -> List[Any]:
+        sentences = list(sentences)
+        if self.url is None:
+            return self._decompound_locally(sentences, spans)
+        res = []
+        for batch in _batches(sentences, self.batch_size):
+            res.extend(self._request_with_retries(batch, spans))
+        return res
+
+    def decompound(self, sentences: Iterable[str]) -> List[str]:
+        """
+        Return the decompounded sentences, with atoms separated by spaces.
+        """
+        return self._decompound(sentences, spans=False)
+
+    def spans(self, sentences: Iterable[str]) -> List[List[Span]]:
+        """
+        Return the spans of the tokens of each sentence, see `Splitter.split_spans`.
+        """
+        return self._decompound(sentences, spans=True)
+
+    def decompound_sentence(self, sentence: str) -> str:
+        """
+        Return the decompounded sentence, with atoms separated by spaces.
+        """
+        return self.decompound([sentence])[0]
+
+
+_Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+@dataclass
+class AsyncClient(_BaseClient):
+    """
+    Asynchronous client for the decompounding server, keeping a pool of persistent
+    connections and sending batches of sentences concurrently on them.
+    """
+
+    _pool: List[_Connection] = field(default_factory=list, init=False, repr=False)
+    _slots: Optional[asyncio.Semaphore] = field(default=None, init=False, repr=False)
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Close all pooled connections.
+        """
+        while self._pool:
+            __, writer = self._pool.pop()
+            writer.close()
+            await writer.wait_closed()
+
+    async def _connect(self) -> _Connection:
+        if self._pool:
+            return self._pool.pop()
+        host, port = self._address()
+        return await asyncio.open_connection(host, port)
+
+    async def _exchange(
+        self, conn: _Connection, batch: List[str], spans: bool
+    ) -> List[Any]:
+        reader, writer = conn
+        host, port = self._address()
+        body = self._body(batch, spans)
+        writer.write(
+            (
+                f"POST / HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode()
+            + body
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by server")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, __, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._pool.append(conn)
+        return _check_response(status, body, spans)
+
+    async def _request(self, batch: List[str], spans: bool) -> List[Any]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+        async with self._slots:
+            try:
+                conn = await asyncio.wait_for(self._connect(), timeout=self.timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                raise _TransientError(e)
+            try:
+                return await asyncio.wait_for(
+                    self._exchange(conn, batch, spans), timeout=self.timeout
+                )
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                # the other pooled connections are likely stale as well
+                conn[1].close()
+                for __, writer in self._pool:
+                    writer.close()
+                self._pool.clear()
+                raise _TransientError(e)
+
+    async def _request_with_retries(self, batch: List[str], spans: bool) -> List[Any]:
+        for attempt in range(self.retries + 1):
+            try:
+                return await self._request(batch, spans)
+            except _TransientError as e:
+                logging.info(f"attempt {attempt + 1} failed: {e}")
+                if attempt < self.retries:
+                    await asyncio.sleep(self.backoff * 2**attempt)
+        raise ClientError(f"server {self.url} unreachable")
+
+    async def _decompound(self, sentences: Iterable[str], spans: bool) -> List[Any]:
+        sentences = list(sentences)
+        if self.url is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self._decompound_locally, sentences, spans
+            )
+        results = await asyncio.gather(
+            *(
+                self._request_with_retries(batch, spans)
+                for batch in _batches(sentences, self.batch_size)
+            )
+        )
+        return [s for batch in results for s in batch]
+
+    async def decompound(self, sentences: Iterable[str]) -> List[str]:
+        """
+        Return the decompounded sentences, with atoms separated by spaces.
+        """
+        return await self._decompound(sentences, spans=False)
+
+    async def spans(self, sentences: Iterable[str]) -> List[List[Span]]:
+        """
+        Return the spans of the tokens of each sentence, see `Splitter.split_spans`.
+        """
+        return await self._decompound(sentences, spans=True)
+
+    async def decompound_sentence(self, sentence: str) -> str:
+        """
+        Return the decompounded sentence, with atoms separated by spaces.
+        """
+        return (await self.decompound([sentence]))[0]
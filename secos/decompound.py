@@ -1,8 +1,47 @@
 import gzip
+import hashlib
+import heapq
+import json
 import logging
-from dataclasses import dataclass, field
+import math
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
 from enum import IntEnum
-from typing import IO, Dict, Iterable, List, Optional, Set, Tuple
+from types import MappingProxyType
+from typing import (
+    IO,
+    Any,
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .cache import _DICT_ENTRY_SIZE, SplitCache
+from .train import Trainer
+from .trie import Trie
+
+# the start and end offsets of a token, and the offsets of the boundaries between
+# its atoms
+Span = Tuple[int, int, List[int]]
+
+_TOKEN = re.compile(r"\S+")
+
+# number of parts of dashed compounds whose split is kept by each compiled model
+_PART_SPLITS_SIZE = 100000
+
+# names of the methods giving split candidates, in the order of the diagnostic
+# columns
+_METHODS = ["C1", "C2", "C3", "U"]
 
 
 def nopen(f: str) -> IO[str]:
@@ -10,66 +49,43 @@ def nopen(f: str) -> IO[str]:
     Opens the given filename, handling tarballs if they end in '.gz'
     """
     if f.endswith(".gz"):
-        return gzip.open(f)
+        return gzip.open(f, "rt", encoding="utf-8")
     return open(f, encoding="utf-8")
 
 
-@dataclass
-class Splitter:
+class _Scoring:
     """
-    This class uses a trained model to split a compound word into its constituent atoms.
+    Scoring of the split candidates, shared by the Splitter while loading and by the
+    CompiledModel answering queries.
     """
 
-    class DashBehaviour(IntEnum):
-        """
-        Which heuristic should the decompounder use to split dashed-words.
-        """
+    __slots__ = ()
 
-        REMOVE = 1
-        SPLIT = 2
-        IGNORE = 3
+    epsilon: float
+    min_word_length: int
+    prefix_length: int
+    suffix_length: int
+    _part_count: Mapping[str, int]
+    _normaliser: float
 
-    epsilon: float = 0.01
-    min_word_length: int = 5
-    min_word_count: int = 50
-    prefix_length: int = 3
-    suffix_length: int = 3
-    dash_words: DashBehaviour = DashBehaviour.IGNORE
-    uppercase_first_letter: bool = False
-    single_words: Set[str] = field(default_factory=set, init=False)
-    # count suffixes and prefixes
-    total_word_count: int = field(default=0, init=False)
-    word_count: Dict[str, int] = field(default_factory=dict, init=False)
-    comp1: Dict[str, str] = field(default_factory=dict, init=False)
-    comp2: Dict[str, str] = field(default_factory=dict, init=False)
-    comp3: Dict[str, str] = field(default_factory=dict, init=False)
-
-    def _remove_word(self, w: str) -> bool:
+    def _remove_short_and_equal(
+        self, wcl: str, ws: Iterable[Tuple[str, str]]
+    ) -> List[Tuple[str, str]]:
         """
-        Returns True if the input word should be discarded from the input corpus.
+        Takes a case-folded word and a list of words with their case-folded form,
+        returns a list corresponding to the set of all valid words in the list which
+        are nested in but different from the given word.
         """
-        if len(w.replace("-", "")) == 0:
-            return True
-        if self.min_word_count <= 0:
-            return False
-        return self.word_count.get(w, 0) < self.min_word_count
-
-    def _remove_short_and_equal(self, wc: str, ws: Iterable[str]) -> List[str]:
-        """
-        Takes a word and a list of words, returns a list corresponding to the set of
-        all valid words in the list which are nested in but different from the given
-        word.
-        """
-        nws = set()
-        for w in ws:
+        nws = {}
+        for (w, wl) in ws:
             if (
                 len(w) >= self.min_word_length
-                and w.lower() != wc.lower()
+                and wl != wcl
                 and not w.isupper()
-                and w.lower() in wc.lower()
+                and wl in wcl
             ):
-                nws.add(w)
-        return list(nws)
+                nws[w] = wl
+        return list(nws.items())
 
     def _append_suffix(self, w: str) -> str:
         """
@@ -108,13 +124,15 @@ class Splitter:
         tot = 1.0
         split = comp.split("-")
         for c in split:
-            if self.uppercase_first_letter:
-                c = c[0].upper() + c[1:]
-            tot *= (self.word_count.get(c, 0) + self.epsilon) / (
-                self.total_word_count + self.epsilon * len(self.word_count)
-            )
+            tot *= self._get_part_score(c)
         return pow(tot, 1.0 / len(split))
 
+    def _get_part_score(self, c: str) -> float:
+        """
+        Calculates the smoothed relative frequency of a single part of a compound.
+        """
+        return (self._part_count.get(c, 0) + self.epsilon) / self._normaliser
+
     def _append_suffix_and_prefix(self, w: str) -> str:
         """
         Returns the best split candidate by applying suffix-prefix and prefix-suffix.
@@ -131,33 +149,189 @@ class Splitter:
         """
         Try to split the compound w using the split candidates in ws.
         """
+        wl = w.lower()
+        return self._generate_folded_compound(w, wl, ((c, c.lower()) for c in ws))
+
+    def _generate_folded_compound(
+        self, w: str, wl: str, ws: Iterable[Tuple[str, str]]
+    ) -> Optional[str]:
+        """
+        Try to split the compound w, case-folded as wl, using the split candidates in
+        ws given with their case-folded form.
+        """
         # remove too short words
-        nws = self._remove_short_and_equal(w, ws)
+        nws = self._remove_short_and_equal(wl, ws)
         if len(nws) == 0:
             logging.debug(f"NONE: {w}")
             return None
-        nws_sorted = sorted(nws, key=lambda x: len(x), reverse=True)
         # get split points
         splits = set()
-        for n in nws_sorted:
-            if not n.lower() in w.lower():
-                continue
-            idx = w.lower().index(n.lower())
+        for (n, nl) in nws:
+            idx = wl.index(nl)
             splits.add(idx)
             splits.add(idx + len(n))
-        splits_sorted = sorted(list(splits))
-        wc = ""
+        parts = []
         prev = 0
-        for i in splits_sorted:
+        for i in sorted(splits):
             if i == 0:
                 continue
-            wc += w[prev:i] + "-"
+            parts.append(w[prev:i])
             prev = i
-        wc += w[prev:]
+        parts.append(w[prev:])
+        wc = "-".join(parts)
         if wc.endswith("-"):
             wc = wc[:-1]
         return wc
 
+    def _get_highest_prob(self, compounds: Iterable[str]) -> Tuple[int, float]:
+        """
+        Return the index and score of the top-ranking compound. Defaults to (-1, 0.0).
+        """
+        probs = []
+        for c in compounds:
+            p = self._get_word_counts(c)
+            probs.append(p)
+        return max(enumerate(probs), key=lambda x: x[1], default=(-1, 0.0))
+
+
+@dataclass
+class Splitter(_Scoring):
+    """
+    This class uses a trained model to split a compound word into its constituent atoms.
+    """
+
+    class DashBehaviour(IntEnum):
+        """
+        Which heuristic should the decompounder use to split dashed-words.
+        """
+
+        REMOVE = 1
+        # the parts of dashed words are split separately, both when loading the
+        # candidates and when answering queries
+        SPLIT = 2
+        IGNORE = 3
+
+    class Engine(IntEnum):
+        """
+        Which algorithm should the decompounder use to split unknown words.
+        """
+
+        # union of the split points of the first occurrence of each single word
+        GREEDY = 1
+        # highest-scoring segmentation over the single words, by dynamic programming
+        VITERBI = 2
+
+    # version of the format written by save_model, and the parameters it saves
+    MODEL_VERSION: ClassVar[int] = 1
+    # version of the splits computed from a model, to be increased whenever they
+    # change, so that the splits cached by an older version are not used
+    SPLIT_VERSION: ClassVar[int] = 2
+    MODEL_PARAMETERS: ClassVar[Tuple[str, ...]] = (
+        "epsilon",
+        "min_word_length",
+        "min_word_count",
+        "prefix_length",
+        "suffix_length",
+        "dash_words",
+        "uppercase_first_letter",
+        "prune_min_count",
+        "prune_max_bytes",
+    )
+
+    # parameters the precomputed normaliser and part counts depend on
+    _INDEXED_PARAMETERS: ClassVar[Tuple[str, ...]] = (
+        "epsilon",
+        "uppercase_first_letter",
+    )
+
+    epsilon: float = 0.01
+    min_word_length: int = 5
+    min_word_count: int = 50
+    prefix_length: int = 3
+    suffix_length: int = 3
+    dash_words: DashBehaviour = DashBehaviour.IGNORE
+    uppercase_first_letter: bool = False
+    engine: Engine = Engine.GREEDY
+    cache: SplitCache = field(default_factory=SplitCache, repr=False, compare=False)
+    # load-time pruning of the word counts: the words counted less than
+    # prune_min_count are dropped, then the least frequent ones while the counts take
+    # more than about prune_max_bytes, 0 disabling either
+    prune_min_count: int = 0
+    prune_max_bytes: int = 0
+    single_words: Set[str] = field(default_factory=set, init=False)
+    # count suffixes and prefixes
+    total_word_count: int = field(default=0, init=False)
+    # number and total count of the pruned words, still part of the normaliser
+    pruned_words: int = field(default=0, init=False)
+    pruned_word_count: int = field(default=0, init=False)
+    word_count: Dict[str, int] = field(default_factory=dict, init=False)
+    comp1: Dict[str, str] = field(default_factory=dict, init=False)
+    comp2: Dict[str, str] = field(default_factory=dict, init=False)
+    comp3: Dict[str, str] = field(default_factory=dict, init=False)
+    # keys precomputed at load time, so that queries only case-fold the query word
+    _part_count: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _normaliser: float = field(default=0.0, init=False, repr=False)
+    _folded_single_words: List[Tuple[str, str]] = field(
+        default_factory=list, init=False, repr=False
+    )
+    # the read-only model answering queries, compiled on first use
+    _model: Optional["CompiledModel"] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+    # whether the loaded dictionaries are shared with a compiled model
+    _shared: bool = field(default=False, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in self._INDEXED_PARAMETERS and hasattr(self, "_part_count"):
+            # setting the normaliser and part counts compiles the model again
+            self._index_word_count()
+        elif name == "cache":
+            # compile the model again with the new cache on the next query
+            super().__setattr__("_model", None)
+        elif name in CompiledModel.__slots__:
+            self._invalidate()
+
+    def _invalidate(self) -> None:
+        """
+        Drop the compiled model, compiled again with the new values on the next
+        query, and the splits it cached, which may have changed.
+        """
+        super().__setattr__("_model", None)
+        if "cache" in self.__dict__:
+            self.cache.clear()
+
+    @contextmanager
+    def _loading(self) -> Iterator[None]:
+        """
+        Hold the lock while changing the loaded data, so that no model is compiled
+        from partly loaded data: queries needing a new model wait for the loading to
+        finish. Since the models compiled before, possibly still used by other
+        threads, share the loaded dictionaries, these are copied first.
+        """
+        with self._lock:
+            self._invalidate()
+            if self._shared:
+                self.word_count = dict(self.word_count)
+                self.comp1 = dict(self.comp1)
+                self.comp2 = dict(self.comp2)
+                self.comp3 = dict(self.comp3)
+                self._shared = False
+            yield
+
+    def _remove_word(self, w: str) -> bool:
+        """
+        Returns True if the input word should be discarded from the input corpus.
+        """
+        if len(w.replace("-", "")) == 0:
+            return True
+        if self.min_word_count <= 0:
+            return False
+        return self.word_count.get(w, 0) < self.min_word_count
+
     def _add_compound(self, comp: Dict[str, str], w: str, ws: Optional[str]) -> None:
         """
         If ws is a real split candidate, add the mapping from w to it in comp.
@@ -167,11 +341,12 @@ class Splitter:
             comp[w] = ws_merged
             logging.debug(f"Result: {w}\t{ws}\t{ws_merged}")
 
-    def _process_compound(self, comp: Dict[str, str], w: str, wns: str) -> None:
+    def _process_compound(
+        self, comp: Dict[str, str], w: str, wns_split: List[str]
+    ) -> None:
         """
         Process trained data for the word w, with candidates wns, in the mapping cmp.
         """
-        wns_split = wns.split(" ")
         if "-" in w and self.dash_words == self.DashBehaviour.REMOVE:
             return
         if self.dash_words == self.DashBehaviour.SPLIT:
@@ -183,63 +358,83 @@ class Splitter:
             res = self._generate_compound(w, wns_split)
             self._add_compound(comp, w, res)
 
-    def _unknown_word_compounding(self, w: str) -> Tuple[str, Set[str]]:
-        """
-        Compute a split candidate or itself, and the candidate atoms for any word,
-        as if it were out of vocabulary.
+    def read_word_count(self, name: str) -> None:
         """
+        Read the word counts from a file formatted in two tab-separated columns:
+        the words in the first column, their count in the second.
 
-        def contained_in(c: str, cands: Iterable[str]) -> bool:
-            for cj in cands:
-                if c.lower() in cj.lower() and c.lower() != cj.lower():
-                    return True
-            return False
+        The words are pruned according to prune_min_count and prune_max_bytes, their
+        counts being kept in total_word_count.
 
-        cands = set()
-        for s in self.single_words:
-            if s.lower() in w.lower() and not s.lower() == w.lower():
-                cands.add(s)
-        cands_new = set()
-        for ci in cands:
-            if not contained_in(ci, cands):
-                cands_new.add(ci)
-        res = self._generate_compound(w, cands_new)
-        logging.debug(f"unknown1: {res}")
-        if res is None:
-            res = w
-        else:
-            res = self._append_suffix_and_prefix(res)
-        logging.debug(f"unknown2: {res}")
-        return (res, cands_new)
+        The file can be opened with gzip if it ends in '.gz'.
+        """
+        with self._loading():
+            # least frequent words first, when the size of the counts is capped
+            kept: List[Tuple[int, int, str]] = []
+            size = 0
+            for i, l in enumerate(nopen(name)):
+                try:
+                    ls = l.strip().split("\t")
+                    if len(ls) < 2:
+                        logging.info(f"{name}:{i}: split error")
+                        continue  # Don't crash on error-prone split
+                    wc = int(ls[1])
+                    self.total_word_count += wc
+                    if wc < self.prune_min_count:
+                        self._prune_word(wc)
+                    elif self.prune_max_bytes <= 0:
+                        self.word_count[ls[0]] = wc
+                    else:
+                        heapq.heappush(kept, (wc, i, ls[0]))
+                        size += self._word_count_entry_size(ls[0], wc)
+                        while size > self.prune_max_bytes:
+                            (c, __, w) = heapq.heappop(kept)
+                            size -= self._word_count_entry_size(w, c)
+                            self._prune_word(c)
+                except UnicodeEncodeError as e:
+                    logging.info(f"{name}:{i}: ", e)
+            for (c, __, w) in sorted(kept, key=lambda x: x[1]):
+                self.word_count[w] = c
+            if self.pruned_words > 0:
+                logging.info(
+                    f"{name}: pruned {self.pruned_words} words counted "
+                    f"{self.pruned_word_count} times"
+                )
+            self._index_word_count()
 
-    def _get_highest_prob(self, compounds: Iterable[str]) -> Tuple[int, float]:
+    @staticmethod
+    def _word_count_entry_size(w: str, c: int) -> int:
         """
-        Return the index and score of the top-ranking compound. Defaults to (-1, 0.0).
+        Return the approximate number of bytes used by the count of a word.
         """
-        probs = []
-        for c in compounds:
-            p = self._get_word_counts(c)
-            probs.append(p)
-        return max(enumerate(probs), key=lambda x: x[1], default=(-1, 0.0))
+        return sys.getsizeof(w) + sys.getsizeof(c) + _DICT_ENTRY_SIZE
 
-    def read_word_count(self, name: str) -> None:
+    def _prune_word(self, c: int) -> None:
         """
-        Read the word counts from a file formatted in two tab-separated columns:
-        the words in the first column, their count in the second.
+        Add a word counted c times to the pruned words.
+        """
+        self.pruned_words += 1
+        self.pruned_word_count += c
 
-        The file can be opened with gzip if it ends in '.gz'.
+    def _index_word_count(self) -> None:
         """
-        for i, l in enumerate(nopen(name)):
-            try:
-                ls = l.strip().split("\t")
-                if len(ls) < 2:
-                    logging.info(f"{name}:{i}: split error")
-                    continue  # Don't crash on error-prone split
-                wc = int(ls[1])
-                self.word_count[ls[0]] = wc
-                self.total_word_count += wc
-            except UnicodeEncodeError as e:
-                logging.info(f"{name}:{i}: ", e)
+        Precompute the normaliser of _get_part_score, and the count used for each part
+        spelling: when uppercase_first_letter is set, a part is counted as its
+        capitalised form, so both spellings are mapped to the capitalised count.
+        """
+        vocabulary_size = len(self.word_count) + self.pruned_words
+        self._normaliser = self.total_word_count + self.epsilon * vocabulary_size
+        if not self.uppercase_first_letter:
+            self._part_count = self.word_count
+            return
+        self._part_count = {}
+        for (w, c) in self.word_count.items():
+            if w[:1].upper() + w[1:] != w:
+                continue
+            self._part_count[w] = c
+            wl = w[:1].lower() + w[1:]
+            if wl[:1].upper() + wl[1:] == w:
+                self._part_count[wl] = c
 
     def read_knowledge(self, name: str) -> None:
         """
@@ -249,28 +444,126 @@ class Splitter:
 
         The file can be opened with gzip if it ends in '.gz'.
         """
-        for i, l in enumerate(nopen(name)):
-            try:
-                ls = l.rstrip("\n").split("\t")
-                if len(ls) < 4:
-                    logging.info(f"{name}:{i}: split error")
-                    continue  # Don't crash on error-prone split
-                w = ls[0]
-                if not self._remove_word(w):
-                    self._process_compound(self.comp1, w, ls[1])
-                    self._process_compound(self.comp2, w, ls[2])
-                    self._process_compound(self.comp3, w, ls[3])
-            except UnicodeEncodeError as e:
-                logging.info(f"{name}:{i}: ", e)
+        with self._loading():
+            for i, l in enumerate(nopen(name)):
+                try:
+                    ls = l.rstrip("\n").split("\t")
+                    if len(ls) < 4:
+                        logging.info(f"{name}:{i}: split error")
+                        continue  # Don't crash on error-prone split
+                    if self._remove_word(ls[0]):
+                        continue
+                    self._process_candidates(
+                        ls[0],
+                        self._usable_candidates(ls[1]),
+                        self._usable_candidates(ls[2]),
+                        self._usable_candidates(ls[3]),
+                    )
+                except UnicodeEncodeError as e:
+                    logging.info(f"{name}:{i}: ", e)
+
+    def _usable_candidates(self, wns: str) -> List[str]:
+        """
+        Split a column of space-separated splitting candidates, skipping the ones too
+        short to ever be used.
+        """
+        return [w for w in wns.split(" ") if len(w) >= self.min_word_length]
+
+    def _process_candidates(
+        self, w: str, c1: List[str], c2: List[str], c3: List[str]
+    ) -> None:
+        """
+        Process the three lists of splitting candidates of the word w.
+        """
+        if not self._remove_word(w):
+            self._process_compound(self.comp1, w, c1)
+            self._process_compound(self.comp2, w, c2)
+            self._process_compound(self.comp3, w, c3)
+
+    def read_trainer(self, trainer: Trainer) -> None:
+        """
+        Read the splitting candidates directly from a Trainer, as they are generated,
+        instead of going through a knowledge file.
+        """
+        with self._loading():
+            for (w, word_overlap, sims_overlap) in trainer.candidates():
+                sims = list(sims_overlap)
+                self._process_candidates(w, word_overlap, sims, word_overlap + sims)
 
     def extract_single_words(self) -> None:
         """
         Extract single words from the first set of candidate splits extracted from the
         knowledge file.
         """
-        for c in self.comp1:
-            if "-" in self.comp1[c]:
-                self.single_words |= set(self.comp1[c].split("-"))
+        with self._loading():
+            for c in self.comp1:
+                if "-" in self.comp1[c]:
+                    self.single_words |= set(self.comp1[c].split("-"))
+            # sorted, so that the compiled model does not depend on the order of the set
+            self._folded_single_words = [
+                (s, s.lower()) for s in sorted(self.single_words)
+            ]
+
+    def save_model(self, name: str) -> None:
+        """
+        Save the parameters, word counts and candidate splits as a JSON model, which
+        can be loaded back with load_model.
+
+        The file is compressed with gzip if it ends in '.gz'.
+        """
+        model = {
+            "version": self.MODEL_VERSION,
+            "parameters": {
+                f.name: getattr(self, f.name)
+                for f in fields(self)
+                if f.name in self.MODEL_PARAMETERS
+            },
+            "total_word_count": self.total_word_count,
+            "pruned_words": self.pruned_words,
+            "pruned_word_count": self.pruned_word_count,
+            "word_count": self.word_count,
+            "comp1": self.comp1,
+            "comp2": self.comp2,
+            "comp3": self.comp3,
+        }
+        if name.endswith(".gz"):
+            f: IO[str] = gzip.open(name, "wt", encoding="utf-8")
+        else:
+            f = open(name, "w", encoding="utf-8")
+        with f:
+            json.dump(model, f, ensure_ascii=False)
+
+    @classmethod
+    def load_model(cls, name: str, **kwargs: Any) -> "Splitter":
+        """
+        Load a model written by save_model, ready for splitting. The other
+        parameters of the Splitter can be given as keyword arguments, but not the
+        ones saved with the model, which raise a ValueError.
+
+        The file can be opened with gzip if it ends in '.gz'.
+        """
+        saved = sorted(set(kwargs) & set(cls.MODEL_PARAMETERS))
+        if saved:
+            raise ValueError(
+                f"{name}: {', '.join(saved)} saved with the model cannot be overridden"
+            )
+        with nopen(name) as f:
+            model = json.load(f)
+        if model.get("version") != cls.MODEL_VERSION:
+            raise ValueError(f"{name}: unsupported model version")
+        params = model["parameters"]
+        params["dash_words"] = cls.DashBehaviour(params["dash_words"])
+        splitter = cls(**params, **kwargs)
+        splitter.total_word_count = model["total_word_count"]
+        splitter.pruned_words = model.get("pruned_words", 0)
+        splitter.pruned_word_count = model.get("pruned_word_count", 0)
+        splitter.word_count = model["word_count"]
+        splitter._index_word_count()
+        splitter.comp1 = model["comp1"]
+        splitter.comp2 = model["comp2"]
+        splitter.comp3 = model["comp3"]
+        splitter.extract_single_words()
+        return splitter
 
     def prepare_decompounding(self, file_count: str, file_knowledge: str) -> None:
         """
@@ -284,11 +577,277 @@ class Splitter:
         logging.info("extracting single words")
         self.extract_single_words()
 
+    def compile(self) -> "CompiledModel":
+        """
+        Return the read-only model answering queries with the loaded data and the
+        current parameters, compiling it on first use after a change.
+        """
+        model = self._model
+        if model is None:
+            with self._lock:
+                model = self._model
+                if model is None:
+                    model = CompiledModel(self)
+                    super().__setattr__("_model", model)
+                    self._shared = True
+        return model
+
+    def _unknown_word_compounding(self, w: str) -> Tuple[str, Set[str]]:
+        """
+        See `CompiledModel._unknown_word_compounding`.
+        """
+        return self.compile()._unknown_word_compounding(w)
+
+    def split_compound(self, w: str) -> Optional[str]:
+        """
+        See `CompiledModel.split_compound`.
+        """
+        return self.compile().split_compound(w)
+
+    def diagnostic_columns(self, w: str) -> List[str]:
+        """
+        See `CompiledModel.diagnostic_columns`.
+        """
+        return self.compile().diagnostic_columns(w)
+
+    def split_word(self, w: str) -> str:
+        """
+        See `CompiledModel.split_word`.
+        """
+        return self.compile().split_word(w)
+
+    def split_words(self, words: Iterable[str]) -> List[str]:
+        """
+        See `CompiledModel.split_words`.
+        """
+        return self.compile().split_words(words)
+
+    def split_spans(
+        self, text: str, tokens: Optional[Iterable[Tuple[int, int]]] = None
+    ) -> Iterator[Span]:
+        """
+        See `CompiledModel.split_spans`.
+        """
+        return self.compile().split_spans(text, tokens)
+
+    def fingerprint(self, *files: str) -> str:
+        """
+        Return a digest of the split version, the splitting parameters and the given
+        model files' name, size and modification time, identifying the splits it
+        computes.
+        """
+        h = hashlib.sha1()
+        h.update(f"split_version={self.SPLIT_VERSION}\n".encode())
+        for f in fields(self):
+            if f.init and f.compare:
+                h.update(f"{f.name}={getattr(self, f.name)!r}\n".encode())
+        for name in files:
+            st = os.stat(name)
+            h.update(
+                f"{os.path.abspath(name)}:{st.st_size}:{st.st_mtime_ns}\n".encode()
+            )
+        return h.hexdigest()
+
+
+class CompiledModel(_Scoring):
+    """
+    Read-only model compiled by `Splitter.compile` from the loaded data and the
+    parameters of a Splitter, answering queries. Its attributes cannot be set and
+    its containers are immutable, so it can be shared by threads without locking.
+    Only the cache it fills is shared with the Splitter, and the splits of the
+    parts of dashed compounds are kept by the model itself.
+    """
+
+    __slots__ = (
+        "epsilon",
+        "min_word_length",
+        "prefix_length",
+        "suffix_length",
+        "dash_words",
+        "engine",
+        "cache",
+        "_generation",
+        "comp1",
+        "comp2",
+        "comp3",
+        "_part_count",
+        "_normaliser",
+        "_folded_single_words",
+        "_trie",
+        "_part_splits",
+    )
+
+    epsilon: float
+    min_word_length: int
+    prefix_length: int
+    suffix_length: int
+    dash_words: "Splitter.DashBehaviour"
+    engine: "Splitter.Engine"
+    cache: SplitCache
+    # the generation of the cache the splits are computed for
+    _generation: int
+    comp1: Mapping[str, str]
+    comp2: Mapping[str, str]
+    comp3: Mapping[str, str]
+    _part_count: Mapping[str, int]
+    _normaliser: float
+    _folded_single_words: Tuple[Tuple[str, str], ...]
+    # the case-folded single words usable as split candidates, for the VITERBI
+    # engine, never modified once built
+    _trie: Optional[Trie]
+    # the splits of the parts of dashed compounds, computed by this model only
+    _part_splits: SplitCache
+
+    def __init__(self, splitter: Splitter) -> None:
+        trie = None
+        if splitter.engine == Splitter.Engine.VITERBI:
+            trie = Trie()
+            for (s, sl) in splitter._folded_single_words:
+                if len(s) >= splitter.min_word_length and not s.isupper():
+                    trie.add(sl, s)
+        values = {
+            "epsilon": splitter.epsilon,
+            "min_word_length": splitter.min_word_length,
+            "prefix_length": splitter.prefix_length,
+            "suffix_length": splitter.suffix_length,
+            "dash_words": splitter.dash_words,
+            "engine": splitter.engine,
+            "cache": splitter.cache,
+            "_generation": splitter.cache.generation,
+            "comp1": MappingProxyType(splitter.comp1),
+            "comp2": MappingProxyType(splitter.comp2),
+            "comp3": MappingProxyType(splitter.comp3),
+            "_part_count": MappingProxyType(splitter._part_count),
+            "_normaliser": splitter._normaliser,
+            "_folded_single_words": tuple(splitter._folded_single_words),
+            "_trie": trie,
+            "_part_splits": SplitCache(_PART_SPLITS_SIZE),
+        }
+        for (name, value) in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def _unknown_word_compounding(self, w: str) -> Tuple[str, Set[str]]:
+        """
+        Compute a split candidate or itself, and the candidate atoms for any word,
+        as if it were out of vocabulary.
+        """
+        wl = w.lower()
+        if self.engine == Splitter.Engine.VITERBI:
+            return self._viterbi_word_compounding(w, wl)
+
+        def contained_in(cl: str, cands: Iterable[Tuple[str, str]]) -> bool:
+            for (__, cjl) in cands:
+                if cl in cjl and cl != cjl:
+                    return True
+            return False
+
+        cands = []
+        for (s, sl) in self._folded_single_words:
+            if sl in wl and not sl == wl:
+                cands.append((s, sl))
+        cands_new = []
+        for (ci, cil) in cands:
+            if not contained_in(cil, cands):
+                cands_new.append((ci, cil))
+        res = self._generate_folded_compound(w, wl, cands_new)
+        logging.debug(f"unknown1: {res}")
+        if res is None:
+            res = w
+        else:
+            res = self._append_suffix_and_prefix(res)
+        logging.debug(f"unknown2: {res}")
+        return (res, {c for (c, __) in cands_new})
+
+    def _viterbi_word_compounding(self, w: str, wl: str) -> Tuple[str, Set[str]]:
+        """
+        Compute the split of w, case-folded as wl, maximizing _get_word_counts, and
+        the single words it uses, as if it were out of vocabulary.
+
+        Each part is a single word, optionally preceded by up to prefix_length and
+        followed by up to suffix_length characters. Since the score is a geometric
+        mean, the best sum of log-scores is kept for each number of parts.
+        """
+        trie = self._trie
+        assert trie is not None
+        n = len(w)
+        # best[i][k]: (log-score, start of last part, atom) of the best split of
+        # w[:i] in k parts
+        best: List[Dict[int, Tuple[float, int, str]]] = [{} for _ in range(n + 1)]
+        best[0][0] = (0.0, -1, "")
+        scores: Dict[Tuple[int, int], float] = {}
+        for i in range(n):
+            if not best[i]:
+                continue
+            for p in range(min(self.prefix_length, n - i - 1) + 1):
+                for j, atom in trie.matches(wl, i + p):
+                    if i + p == 0 and j == n:
+                        continue  # the word itself is not a candidate
+                    for e in range(j, min(j + self.suffix_length, n) + 1):
+                        if (i, e) not in scores:
+                            scores[(i, e)] = math.log(self._get_part_score(w[i:e]))
+                        s = scores[(i, e)]
+                        for (k, prev) in best[i].items():
+                            score = prev[0]
+                            cur = best[e].get(k + 1)
+                            if cur is None or score + s > cur[0]:
+                                best[e][k + 1] = (score + s, i, atom)
+        if not best[n]:
+            logging.debug(f"NONE: {w}")
+            return (w, set())
+        k = max(best[n], key=lambda k: best[n][k][0] / k)
+        parts = []
+        cands = set()
+        end = n
+        while k > 0:
+            (__, start, atom) = best[end][k]
+            parts.append(w[start:end])
+            cands.add(atom)
+            end = start
+            k -= 1
+        res = "-".join(reversed(parts))
+        logging.debug(f"viterbi: {res}")
+        return (res, cands)
+
+    def _split_dashed_compound(self, w: str) -> Optional[str]:
+        """
+        Return w with each of its dash-separated parts split, see `_split_part`, or
+        None if none of them could be split.
+        """
+        parts = w.split("-")
+        splits = [self._split_part(p) if p else p for p in parts]
+        if splits == parts:
+            return None
+        return "-".join(splits)
+
+    def _split_part(self, p: str) -> str:
+        """
+        Return the split of a part of a dashed compound, or the part itself, see
+        `split_compound`. The splits are kept by the model rather than in the
+        shared cache, so that they only depend on its data.
+        """
+        res = self._part_splits.get(p)
+        if res is None:
+            res = self.split_compound(p) or p
+            self._part_splits.put(p, res)
+        return res
+
     def split_compound(self, w: str) -> Optional[str]:
         """
         Return the best split candidate for a given compound, or None
         if no good candidate was found.
+
+        With the SPLIT dash behaviour, the parts of a dashed compound are split
+        separately, since the candidates are only known for them, and the split of
+        each part is kept by the model.
         """
+        if "-" in w and self.dash_words == Splitter.DashBehaviour.SPLIT:
+            return self._split_dashed_compound(w)
         c1 = self.comp1.get(w, w)
         c2 = self.comp2.get(w, w)
         c3 = self.comp3.get(w, w)
@@ -298,3 +857,93 @@ class Splitter:
         if idx >= 0:
             return cands[idx]
         return None
+
+    def diagnostic_columns(self, w: str) -> List[str]:
+        """
+        Return the columns of decompound_secos.py explaining the split of w: the
+        method with the best scoring split and that split, the first method
+        splitting w and that split, then the split of each method.
+
+        With the SPLIT dash behaviour, the chosen split of a dashed compound is the
+        one of its parts, as returned by split_compound, with the method D.
+        """
+        c1 = self.comp1.get(w, w)
+        c2 = self.comp2.get(w, w)
+        c3 = self.comp3.get(w, w)
+        (u, __) = self._unknown_word_compounding(w)
+        cands = [c1, c2, c3, u]
+        prefix = "W"
+        cand = w
+        for (method, c) in zip(_METHODS, cands):
+            if "-" in c:
+                (prefix, cand) = (method, c)
+                break
+        (idx, score) = self._get_highest_prob(cands)
+        pprefix = "W"
+        pcand = w
+        if "-" in w and self.dash_words == Splitter.DashBehaviour.SPLIT:
+            (pprefix, pcand) = ("D", self._split_dashed_compound(w) or w)
+        elif idx >= 0:
+            (pprefix, pcand) = (_METHODS[idx], cands[idx])
+        return [pprefix, pcand, prefix, cand, c1, c2, c3, u]
+
+    def split_word(self, w: str) -> str:
+        """
+        Return the best split candidate for a given word, or the word itself if no
+        good candidate was found, reading and filling the cache.
+        """
+        res = self.cache.get(w)
+        if res is None:
+            res = self.split_compound(w) or w
+            self.cache.put(w, res, self._generation)
+        return res
+
+    def split_words(self, words: Iterable[str]) -> List[str]:
+        """
+        Return the split of each word, see `split_word`, splitting the words
+        repeated in the batch only once.
+        """
+        splits: Dict[str, str] = {}
+        res = []
+        for w in words:
+            split = splits.get(w)
+            if split is None:
+                split = splits[w] = self.split_word(w)
+            res.append(split)
+        return res
+
+    def split_spans(
+        self, text: str, tokens: Optional[Iterable[Tuple[int, int]]] = None
+    ) -> Iterator[Span]:
+        """
+        Yield the span of each token of text, with the offsets in text of the
+        boundaries between its atoms. The tokens are separated by whitespace,
+        unless given as pairs of start and end offsets.
+        """
+        if tokens is None:
+            tokens = (m.span() for m in _TOKEN.finditer(text))
+        for (start, end) in tokens:
+            w = text[start:end]
+            yield (start, end, self._atom_boundaries(w, self.split_word(w), start))
+
+    @staticmethod
+    def _atom_boundaries(w: str, split: str, offset: int = 0) -> List[int]:
+        """
+        Return the offsets, shifted by offset, of the dashes inserted in w to get
+        split. The split may also drop some of the dashes of w, e.g: the leading
+        ones, or merge consecutive ones, so both are aligned character by character.
+        """
+        boundaries = []
+        i = 0
+        for c in split:
+            if c == "-":
+                if i < len(w) and w[i] == "-":
+                    i += 1
+                else:
+                    boundaries.append(offset + i)
+                continue
+            # skip the dashes of w missing from split
+            while i < len(w) and w[i] == "-":
+                i += 1
+            i += 1
+        return boundaries
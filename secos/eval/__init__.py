@@ -1,3 +1,28 @@
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from .abstract import AbstractEvaluator
 from .simple import Evaluator
-from .wilcoxon import WilcoxonEvaluator
+
+if TYPE_CHECKING:
+    from .engines import EngineEvaluator
+    from .equivalence import EquivalenceEvaluator
+    from .nway import NWayEvaluator
+    from .pruning import PruningEvaluator
+    from .wilcoxon import WilcoxonEvaluator
+
+# evaluators imported on first access, since they depend on numpy and scipy or on
+# the whole splitter
+_LAZY_EVALUATORS = {
+    "EngineEvaluator": ".engines",
+    "EquivalenceEvaluator": ".equivalence",
+    "NWayEvaluator": ".nway",
+    "PruningEvaluator": ".pruning",
+    "WilcoxonEvaluator": ".wilcoxon",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_EVALUATORS:
+        return getattr(importlib.import_module(_LAZY_EVALUATORS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
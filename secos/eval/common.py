@@ -1,4 +1,4 @@
-from typing import NamedTuple, Set
+from typing import NamedTuple, Set, Tuple
 
 
 class EvalResult(NamedTuple):
@@ -37,3 +37,14 @@ def evaluate(w1: str, w2: str) -> EvalResult:
     wnc = len(w1i - w2i)
     wfc = len(w2i - w1i)
     return EvalResult(cc, wfc, wnc)
+
+
+def compute_scores(k: EvalResult) -> Tuple[float, float, float]:
+    """
+    Compute the precision, recall and F1 score from an evaluation result.
+    """
+    if k.correct == 0:
+        return (0.0, 0.0, 0.0)
+    p = k.correct / (k.correct + k.wrong)
+    r = k.correct / sum(k)
+    return (p, r, 2 * p * r / (p + r))
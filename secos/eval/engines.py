@@ -0,0 +1,69 @@
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List, TextIO, Tuple
+
+from ..decompound import Splitter
+from .abstract import AbstractEvaluator
+from .common import EvalResult, compute_scores, evaluate
+
+
+@dataclass
+class EngineEvaluator(AbstractEvaluator):
+    """
+    Compare the accuracy and latency of the splitter engines on a gold standard.
+    """
+
+    splitter: Splitter
+    col_word: int
+    col_gold: int
+    input: TextIO = sys.stdin
+    engines: List[Splitter.Engine] = field(
+        default_factory=lambda: list(Splitter.Engine)
+    )
+
+    def _read_input(self) -> List[Tuple[str, str]]:
+        """
+        Read the words and their gold standard split from the input.
+        """
+        ret = []
+        for l in self.input:
+            ls = l.strip().split("\t")
+            ret.append((ls[self.col_word], ls[self.col_gold].lower()))
+        return ret
+
+    def evaluate(self, output: TextIO = sys.stdout) -> None:
+        """
+        Split every word of the input with each engine, reporting its precision,
+        recall, F1, rate of correct splits and latency per word.
+        """
+        words = self._read_input()
+        engine = self.splitter.engine
+        print(
+            "Engine\tPrecision\tRecall\tF1\tCorrect\tMean(ms)\tP50(ms)\tP95(ms)",
+            file=output,
+        )
+        for e in self.engines:
+            self.splitter.engine = e
+            scores = EvalResult(0, 0, 0)
+            c = 0
+            times = []
+            for (w, gold) in words:
+                start = time.perf_counter()
+                cand = self.splitter.split_compound(w) or w
+                times.append((time.perf_counter() - start) * 1000)
+                cand = cand.lower()
+                scores = EvalResult(
+                    *(sum(x) for x in zip(scores, evaluate(gold, cand)))
+                )
+                if gold == cand:
+                    c += 1
+            (p, r, f) = compute_scores(scores)
+            times.sort()
+            print(
+                f"{e.name}\t{p:.4f}\t{r:.4f}\t{f:.4f}\t{c / len(words):.4f}\t"
+                f"{sum(times) / len(times):.4f}\t{times[len(times) // 2]:.4f}\t"
+                f"{times[int(len(times) * 0.95)]:.4f}",
+                file=output,
+            )
+        self.splitter.engine = engine
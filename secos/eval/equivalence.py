@@ -0,0 +1,270 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple, Union
+
+from ..cache import SplitCache
+from ..decompound import CompiledModel, Splitter
+from .abstract import AbstractEvaluator
+from .reference import ReferenceSplitter
+
+Model = Union[ReferenceSplitter, Splitter, CompiledModel]
+
+
+@dataclass
+class EngineSpec:
+    """
+    A way of loading a model and splitting words with it, to be compared to the
+    reference one. load is given the Splitter holding the parameters, the word count
+    and knowledge files, and the model saved from them by `Splitter.save_model`.
+    """
+
+    name: str
+    load: Callable[[Splitter, str, str, str], Model]
+    split: Callable[[Model, str], str] = lambda model, w: model.split_compound(w) or w
+
+
+def _load(splitter: Splitter, file_count: str, file_knowledge: str) -> Splitter:
+    splitter = replace(splitter, cache=SplitCache())
+    splitter.prepare_decompounding(file_count, file_knowledge)
+    return splitter
+
+
+def _load_reference(
+    splitter: Splitter, file_count: str, file_knowledge: str
+) -> ReferenceSplitter:
+    reference = ReferenceSplitter.like(splitter)
+    reference.prepare_decompounding(file_count, file_knowledge)
+    return reference
+
+
+def _load_saved(splitter: Splitter, model_file: str) -> Splitter:
+    return Splitter.load_model(model_file, engine=splitter.engine, cache=SplitCache())
+
+
+def _split_cached(model: Model, w: str) -> str:
+    assert isinstance(model, Splitter)
+    return model.split_word(w)
+
+
+# the reference engine, the original algorithm, and the available alternatives
+ENGINES: Dict[str, EngineSpec] = {
+    engine.name: engine
+    for engine in [
+        EngineSpec("reference", lambda s, wc, kn, __: _load_reference(s, wc, kn)),
+        EngineSpec(
+            "viterbi",
+            lambda s, wc, kn, __: _load(
+                replace(s, engine=Splitter.Engine.VITERBI), wc, kn
+            ),
+        ),
+        EngineSpec("compiled", lambda s, wc, kn, __: _load(s, wc, kn).compile()),
+        EngineSpec(
+            "cached",
+            lambda s, wc, kn, __: _load(s, wc, kn),
+            _split_cached,
+        ),
+        EngineSpec("model", lambda s, __, ___, model_file: _load_saved(s, model_file)),
+    ]
+}
+
+
+def synthetic_corpus(
+    splitter: ReferenceSplitter, count: int, seed: int = 0
+) -> List[str]:
+    """
+    Return count words drawn from a loaded splitter: words with split candidates,
+    words of the vocabulary, new compounds of two or three single words, and dashed
+    compounds of a word of the vocabulary and a word with split candidates, in equal
+    proportions.
+    """
+    rng = random.Random(seed)
+    known = sorted(splitter.comp1) or [""]
+    vocabulary = sorted(splitter.word_count) or [""]
+    singles = sorted(splitter.single_words) or [""]
+    words = []
+    for i in range(count):
+        if i % 4 == 0:
+            words.append(rng.choice(known))
+        elif i % 4 == 1:
+            words.append(rng.choice(vocabulary))
+        elif i % 4 == 2:
+            parts = rng.choices(singles, k=rng.randint(2, 3))
+            words.append(parts[0] + "".join(p.lower() for p in parts[1:]))
+        else:
+            words.append(f"{rng.choice(vocabulary)}-{rng.choice(known)}")
+    return [w for w in words if w]
+
+
+def _percentile(times: List[float], q: float) -> float:
+    """
+    Return the q-quantile of the sorted list times.
+    """
+    return times[min(int(len(times) * q), len(times) - 1)]
+
+
+@dataclass
+class EquivalenceEvaluator(AbstractEvaluator):
+    """
+    Check that alternative engines split words exactly as the reference one, the
+    original algorithm kept in `ReferenceSplitter`, and produce the same diagnostic
+    columns as decompound_secos.py did, on a corpus of words (by default a synthetic
+    one). The latency percentiles and the peak memory used
+    while loading and splitting are reported for each engine.
+
+    The evaluation fails, setting passed to False, if any word is split differently,
+    if the split chosen in the diagnostic columns of an engine is not its actual
+    split, or if the mean latency of an engine exceeds max_slowdown times the
+    reference one (0 disabling the check).
+    """
+
+    splitter: Splitter
+    file_count: str
+    file_knowledge: str
+    engines: List[str] = field(default_factory=lambda: ["compiled", "cached", "model"])
+    words: Optional[List[str]] = None
+    synthetic_words: int = 100000
+    seed: int = 0
+    max_slowdown: float = 0.0
+    # number of divergent words reported per engine
+    max_reported: int = 20
+    passed: bool = field(default=True, init=False)
+
+    def _load(self, engine: EngineSpec, model_file: str) -> Model:
+        return engine.load(
+            self.splitter, self.file_count, self.file_knowledge, model_file
+        )
+
+    def _run(
+        self, engine: EngineSpec, model_file: str, words: List[str]
+    ) -> Tuple[List[Tuple[str, List[str]]], float, int, List[float]]:
+        """
+        Load the model of engine and split every word with it, returning the split
+        and diagnostic columns of each word, the loading time, the peak memory while
+        loading and splitting, and the sorted latencies in milliseconds.
+
+        The loading time and the latencies are measured without tracing memory, on
+        a newly loaded model, so with a cold cache. The model is then loaded again
+        for the splits and the peak memory.
+        """
+        start = time.perf_counter()
+        model = self._load(engine, model_file)
+        load_time = time.perf_counter() - start
+        times = []
+        for w in words:
+            start = time.perf_counter()
+            engine.split(model, w)
+            times.append((time.perf_counter() - start) * 1000)
+        times.sort()
+        del model
+        tracemalloc.start()
+        model = self._load(engine, model_file)
+        outputs = [
+            (engine.split(model, w), model.diagnostic_columns(w)) for w in words
+        ]
+        (__, peak) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return (outputs, load_time, peak, times)
+
+    @staticmethod
+    def _inconsistent(
+        words: List[str], outputs: List[Tuple[str, List[str]]]
+    ) -> List[Tuple[str, str, str]]:
+        """
+        Return the words whose split differs from the split chosen in their
+        diagnostic columns, with both.
+        """
+        return [
+            (w, split, columns[1])
+            for (w, (split, columns)) in zip(words, outputs)
+            if split != columns[1]
+        ]
+
+    def evaluate(self, output: TextIO = sys.stdout) -> None:
+        """
+        Run the reference and every engine on the words, reporting the divergent
+        words, the latencies and memory peaks of each engine.
+        """
+        reference = ENGINES["reference"]
+        (fd, model_file) = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            words = self.words
+            if words is None:
+                model = self._load(reference, model_file)
+                assert isinstance(model, ReferenceSplitter)
+                words = synthetic_corpus(model, self.synthetic_words, self.seed)
+            if "model" in self.engines:
+                saved = _load(self.splitter, self.file_count, self.file_knowledge)
+                saved.save_model(model_file)
+            (ref_outputs, load_time, peak, ref_times) = self._run(
+                reference, model_file, words
+            )
+            inconsistent = {"reference": self._inconsistent(words, ref_outputs)}
+            results: List[Tuple[str, List[Any]]] = [
+                ("reference", [0, load_time, peak, ref_times])
+            ]
+            divergent: Dict[str, List[Tuple[str, List[str], List[str]]]] = {}
+            for name in self.engines:
+                (outputs, load_time, peak, times) = self._run(
+                    ENGINES[name], model_file, words
+                )
+                inconsistent[name] = self._inconsistent(words, outputs)
+                divergent[name] = [
+                    (w, ref, out)
+                    for (w, ref, out) in zip(
+                        words,
+                        ([s] + c for (s, c) in ref_outputs),
+                        ([s] + c for (s, c) in outputs),
+                    )
+                    if ref != out
+                ]
+                results.append((name, [len(divergent[name]), load_time, peak, times]))
+        finally:
+            os.unlink(model_file)
+        ref_mean = sum(ref_times) / len(ref_times) if ref_times else 0.0
+        print(
+            "Engine\tWords\tDivergent\tInconsistent\tLoad(s)\tPeak(MB)\t"
+            "Mean(ms)\tP50(ms)\tP95(ms)\tP99(ms)\tSlowdown",
+            file=output,
+        )
+        for (name, (count, load_time, peak, times)) in results:
+            mean = sum(times) / len(times) if times else 0.0
+            slowdown = mean / ref_mean if ref_mean > 0 else 0.0
+            print(
+                f"{name}\t{len(words)}\t{count}\t{len(inconsistent[name])}\t"
+                f"{load_time:.2f}\t"
+                f"{peak / 2 ** 20:.1f}\t{mean:.4f}\t{_percentile(times, 0.5):.4f}\t"
+                f"{_percentile(times, 0.95):.4f}\t{_percentile(times, 0.99):.4f}\t"
+                f"{slowdown:.2f}",
+                file=output,
+            )
+            if count > 0 or inconsistent[name]:
+                self.passed = False
+            if self.max_slowdown > 0 and slowdown > self.max_slowdown:
+                print(f"{name}: over the speed budget", file=output)
+                self.passed = False
+        for (name, diffs) in divergent.items():
+            if not diffs:
+                continue
+            print(f"\nDivergent words of {name} ({len(diffs)})", file=output)
+            print("Word\tEngine\tSplit\tC1\tC2\tC3\tU", file=output)
+            for (w, ref, out) in diffs[: self.max_reported]:
+                # the split, then the C1, C2, C3 and U columns
+                for (label, row) in (("reference", ref), (name, out)):
+                    print(f"{w}\t{label}\t{row[0]}\t" + "\t".join(row[5:]), file=output)
+        for (name, words_split) in inconsistent.items():
+            if not words_split:
+                continue
+            print(
+                f"\nWords of {name} split differently from their diagnostic columns "
+                f"({len(words_split)})",
+                file=output,
+            )
+            print("Word\tSplit\tChosen", file=output)
+            for (w, split, chosen) in words_split[: self.max_reported]:
+                print(f"{w}\t{split}\t{chosen}", file=output)
@@ -0,0 +1,196 @@
+import sys
+from array import array
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from itertools import combinations, zip_longest
+from typing import List, Optional, TextIO, Tuple
+
+import numpy as np
+import scipy.stats
+
+from .abstract import AbstractEvaluator
+from .common import EvalResult, compute_scores, evaluate
+
+# maximal number of F1 scores resampled at once by the bootstrap
+_BOOTSTRAP_BLOCK = 10_000_000
+
+
+@dataclass
+class NWayEvaluator(AbstractEvaluator):
+    """
+    Compare any number of systems on the same gold standard in a single pass over
+    their prediction files, testing the significance of the differences between each
+    pair of systems: Wilcoxon signed-rank tests on the F1 score of each compound,
+    exact McNemar tests on the entirely correct splits and, if bootstrap is set,
+    paired bootstrap confidence intervals of the mean F1 score.
+    """
+
+    class InputError(RuntimeError):
+        """
+        Error thrown when input files are not the same length
+        """
+
+        pass
+
+    gold_file: str
+    col_gold: int
+    # the prediction files with the column of the predicted split
+    systems: List[Tuple[str, int]]
+    bootstrap: int = 0
+    confidence: float = 0.95
+    seed: Optional[int] = None
+    # filled by evaluate
+    scores: List[EvalResult] = field(default_factory=list, init=False)
+    f1: np.ndarray = field(default_factory=lambda: np.empty((0, 0)), init=False)
+    correct: np.ndarray = field(default_factory=lambda: np.empty((0, 0)), init=False)
+
+    def names(self) -> List[str]:
+        """
+        Return the name of each system: its file, and its column if needed to tell
+        them apart.
+        """
+        files = [f for (f, __) in self.systems]
+        return [f if files.count(f) == 1 else f"{f}:{col}" for (f, col) in self.systems]
+
+    def read(self) -> None:
+        """
+        Read the gold standard and all predictions, computing the K×N matrices of the
+        F1 score and of the correctness of the split of each of the N compounds by
+        each of the K systems.
+        """
+        k = len(self.systems)
+        f1 = [array("d") for __ in range(k)]
+        correct = [array("b") for __ in range(k)]
+        scores = [EvalResult(0, 0, 0)] * k
+        with ExitStack() as stack:
+            gold_lines = stack.enter_context(open(self.gold_file))
+            files = [stack.enter_context(open(f)) for (f, __) in self.systems]
+            for lines in zip_longest(gold_lines, *files):
+                if None in lines:
+                    raise self.InputError("Files do not have the same length")
+                gold = lines[0].strip().split("\t")[self.col_gold].lower()
+                for (i, l) in enumerate(lines[1:]):
+                    cand = l.strip().split("\t")[self.systems[i][1]].lower()
+                    sc = evaluate(gold, cand)
+                    scores[i] = EvalResult(*(sum(x) for x in zip(scores[i], sc)))
+                    f1[i].append(compute_scores(sc)[2])
+                    correct[i].append(gold == cand)
+        self.scores = scores
+        self.f1 = np.array(f1, dtype=np.float64).reshape(k, -1)
+        self.correct = np.array(correct, dtype=np.int64).reshape(k, -1)
+
+    def wilcoxon(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the statistics and p-values of the Wilcoxon signed-rank test on the
+        differences of F1 scores of each pair of systems, in the order of
+        `itertools.combinations`.
+        """
+        pairs = list(combinations(range(len(self.systems)), 2))
+        if not pairs:
+            return (np.empty(0), np.empty(0))
+        (first, second) = (list(p) for p in zip(*pairs))
+        diffs = self.f1[second] - self.f1[first]
+        # identical systems have no non-zero difference to rank
+        with np.errstate(invalid="ignore", divide="ignore"):
+            res = scipy.stats.wilcoxon(diffs, axis=1, zero_method="wilcox")
+        return (np.atleast_1d(res.statistic), np.atleast_1d(res.pvalue))
+
+    def mcnemar(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the K×K×2×2 contingency tables of the entirely correct splits of each
+        pair of systems, table[i, j, a, b] counting the compounds split correctly
+        (a = 1) or not (a = 0) by system i and correctly (b = 1) or not by system j,
+        and the K×K matrix of p-values of the exact McNemar test.
+        """
+        c = self.correct
+        n = c.shape[1]
+        both = c @ c.T
+        right = c.sum(axis=1)
+        only_first = right[:, None] - both
+        only_second = right[None, :] - both
+        neither = n - both - only_first - only_second
+        tables = np.stack(
+            [np.stack([neither, only_second], -1), np.stack([only_first, both], -1)],
+            -2,
+        )
+        discordant = only_first + only_second
+        smallest = np.minimum(only_first, only_second)
+        pvalues = np.minimum(1.0, 2 * scipy.stats.binom.cdf(smallest, discordant, 0.5))
+        pvalues[discordant == 0] = 1.0
+        return (tables, pvalues)
+
+    def bootstrap_means(self) -> np.ndarray:
+        """
+        Return the K×B matrix of the mean F1 score of each system on B resamples of
+        the compounds, the same resamples being used for all systems.
+        """
+        rng = np.random.default_rng(self.seed)
+        (k, n) = self.f1.shape
+        block = max(1, _BOOTSTRAP_BLOCK // max(k * n, 1))
+        means = []
+        for start in range(0, self.bootstrap, block):
+            b = min(block, self.bootstrap - start)
+            idx = rng.integers(0, n, size=(b, n))
+            means.append(self.f1[:, idx].mean(axis=-1))
+        return np.concatenate(means, axis=1)
+
+    def evaluate(self, output: TextIO = sys.stdout) -> None:
+        """
+        Report the precision, recall, F1 and rate of correct splits of every system,
+        then the significance of the differences between each pair of systems.
+        """
+        self.read()
+        names = self.names()
+        n = self.f1.shape[1]
+        print("System\tPrecision\tRecall\tF1\tCorrect\tMeanF1", file=output)
+        for (i, name) in enumerate(names):
+            (p, r, f) = compute_scores(self.scores[i])
+            print(
+                f"{name}\t{p:.4f}\t{r:.4f}\t{f:.4f}\t"
+                f"{self.correct[i].sum() / n:.4f}\t{self.f1[i].mean():.4f}",
+                file=output,
+            )
+        pairs = list(combinations(range(len(names)), 2))
+        (statistics, pvalues) = self.wilcoxon()
+        (tables, mcn_pvalues) = self.mcnemar()
+        print("\nWilcoxon", file=output)
+        print("System1\tSystem2\tStatistic\tp-value", file=output)
+        for ((i, j), s, p) in zip(pairs, statistics, pvalues):
+            print(f"{names[i]}\t{names[j]}\t{s}\t{p:.6g}", file=output)
+        print("\nMcNemar", file=output)
+        print("System1\tSystem2\tBoth\tFirst\tSecond\tNeither\tp-value", file=output)
+        for (i, j) in pairs:
+            t = tables[i, j]
+            print(
+                f"{names[i]}\t{names[j]}\t{t[1, 1]}\t{t[1, 0]}\t{t[0, 1]}\t{t[0, 0]}\t"
+                f"{mcn_pvalues[i, j]:.6g}",
+                file=output,
+            )
+        if self.bootstrap <= 0 or n == 0:
+            return
+        means = self.bootstrap_means()
+        alpha = (1 - self.confidence) / 2
+        print(
+            f"\nBootstrap {self.confidence:.0%} CI of the mean F1 "
+            f"({self.bootstrap} resamples)",
+            file=output,
+        )
+        print("System\tMeanF1\tLow\tHigh", file=output)
+        (low, high) = np.quantile(means, [alpha, 1 - alpha], axis=1)
+        for (i, name) in enumerate(names):
+            print(
+                f"{name}\t{self.f1[i].mean():.4f}\t{low[i]:.4f}\t{high[i]:.4f}",
+                file=output,
+            )
+        if not pairs:
+            return
+        (first, second) = (list(p) for p in zip(*pairs))
+        diffs = means[second] - means[first]
+        (low, high) = np.quantile(diffs, [alpha, 1 - alpha], axis=1)
+        print("System1\tSystem2\tDiff\tLow\tHigh", file=output)
+        for (k, (i, j)) in enumerate(pairs):
+            diff = self.f1[j].mean() - self.f1[i].mean()
+            print(
+                f"{names[i]}\t{names[j]}\t{diff:.4f}\t{low[k]:.4f}\t{high[k]:.4f}",
+                file=output,
+            )
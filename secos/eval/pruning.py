@@ -0,0 +1,72 @@
+import sys
+from dataclasses import dataclass, field, replace
+from typing import List, TextIO, Tuple
+
+from ..cache import SplitCache
+from ..decompound import Splitter
+from ..registry import estimate_size
+from .abstract import AbstractEvaluator
+from .common import EvalResult, compute_scores, evaluate
+
+
+@dataclass
+class PruningEvaluator(AbstractEvaluator):
+    """
+    Compare the memory used and the accuracy on a gold standard of a model loaded
+    with different vocabulary pruning settings.
+    """
+
+    splitter: Splitter
+    file_count: str
+    file_knowledge: str
+    col_word: int
+    col_gold: int
+    input: TextIO = sys.stdin
+    # pairs of prune_min_count and prune_max_bytes, compared to the unpruned model
+    settings: List[Tuple[int, int]] = field(default_factory=list)
+
+    def evaluate(self, output: TextIO = sys.stdout) -> None:
+        """
+        Load the model with each setting, reporting its number of words, estimated
+        size, and the precision, recall, F1 and rate of correct splits it yields.
+        """
+        words = []
+        for l in self.input:
+            ls = l.strip().split("\t")
+            words.append((ls[self.col_word], ls[self.col_gold].lower()))
+        print(
+            "MinCount\tMaxBytes\tWords\tPruned\tSize(MB)\tSaved\t"
+            "Precision\tRecall\tF1\tCorrect\tDeltaF1",
+            file=output,
+        )
+        base_size = 0
+        base_f = 0.0
+        for (min_count, max_bytes) in [(0, 0)] + self.settings:
+            splitter = replace(
+                self.splitter,
+                prune_min_count=min_count,
+                prune_max_bytes=max_bytes,
+                cache=SplitCache(),
+            )
+            splitter.prepare_decompounding(self.file_count, self.file_knowledge)
+            size = estimate_size(splitter)
+            scores = EvalResult(0, 0, 0)
+            c = 0
+            for (w, gold) in words:
+                cand = (splitter.split_compound(w) or w).lower()
+                scores = EvalResult(
+                    *(sum(x) for x in zip(scores, evaluate(gold, cand)))
+                )
+                if gold == cand:
+                    c += 1
+            (p, r, f) = compute_scores(scores)
+            if (min_count, max_bytes) == (0, 0):
+                base_size = size
+                base_f = f
+            print(
+                f"{min_count}\t{max_bytes}\t{len(splitter.word_count)}\t"
+                f"{splitter.pruned_words}\t{size / 2 ** 20:.2f}\t"
+                f"{1 - size / base_size:.2%}\t{p:.4f}\t{r:.4f}\t{f:.4f}\t"
+                f"{c / len(words):.4f}\t{f - base_f:+.4f}",
+                file=output,
+            )
@@ -0,0 +1,342 @@
+import json
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from .cache import PersistentSplitCache, SplitCache
+from .decompound import CompiledModel, Splitter, nopen
+
+
+def estimate_size(splitter: Splitter) -> int:
+    """
+    Estimate the number of bytes used by the model held by splitter, including the
+    model it compiles for answering queries, not counting its cache.
+    """
+    seen: Set[int] = set()
+
+    def size(o: Any) -> int:
+        if id(o) in seen:
+            return 0
+        seen.add(id(o))
+        n = sys.getsizeof(o)
+        if isinstance(o, dict):
+            n += sum(size(k) + size(v) for (k, v) in o.items())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            n += sum(size(x) for x in o)
+        elif hasattr(o, "__dict__"):
+            n += size(vars(o))
+        return n
+
+    n = sum(size(getattr(splitter, f.name)) for f in fields(splitter) if f.compare)
+    # the compiled model mostly holds views of the splitter's dictionaries, besides
+    # the trie of the VITERBI engine
+    model = splitter.compile()
+    return n + sum(
+        size(getattr(model, name))
+        for name in CompiledModel.__slots__
+        if name != "cache"
+    )
+
+
+@dataclass
+class ModelSpec:
+    """
+    Describe how to load a model: either from a model file written by
+    `Splitter.save_model`, or from a knowledge file and a word count file. The
+    parameters are given to the Splitter, the enumerations by value or by name.
+    At most cache_size splits are kept in memory, 0 meaning no limit.
+    """
+
+    name: str
+    model_file: Optional[str] = None
+    dt_candidates: Optional[str] = None
+    word_count_file: Optional[str] = None
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    cache_file: Optional[str] = None
+    cache_size: int = 100000
+
+    def __post_init__(self) -> None:
+        """
+        Check the spec, so that a wrong configuration fails when it is read rather
+        than on the first request to the model.
+        """
+        if self.model_file is None and (
+            self.dt_candidates is None or self.word_count_file is None
+        ):
+            raise ValueError(f"{self.name}: no model file nor knowledge files given")
+        if self.cache_size < 0:
+            raise ValueError(f"{self.name}: negative cache size {self.cache_size}")
+        names = {f.name for f in fields(Splitter) if f.init}
+        unknown = sorted(set(self.parameters) - names)
+        if unknown:
+            raise ValueError(f"{self.name}: unknown parameters {', '.join(unknown)}")
+        if self.model_file is not None:
+            saved = sorted(set(self.parameters) & set(Splitter.MODEL_PARAMETERS))
+            if saved:
+                raise ValueError(
+                    f"{self.name}: {', '.join(saved)} cannot be set for a model file, "
+                    "which holds its own"
+                )
+        try:
+            self._parameters()
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"{self.name}: invalid parameter {e}")
+
+    def _parameters(self) -> Dict[str, Any]:
+        params = dict(self.parameters)
+        for (key, enum) in (
+            ("dash_words", Splitter.DashBehaviour),
+            ("engine", Splitter.Engine),
+        ):
+            if isinstance(params.get(key), str):
+                params[key] = enum[params[key]]
+            elif key in params:
+                params[key] = enum(params[key])
+        return params
+
+    def load(self) -> Splitter:
+        """
+        Load the model, ready for splitting.
+        """
+        if self.model_file is not None:
+            splitter = Splitter.load_model(self.model_file, **self._parameters())
+            files = [self.model_file]
+        else:
+            assert self.dt_candidates is not None and self.word_count_file is not None
+            splitter = Splitter(**self._parameters())
+            splitter.prepare_decompounding(self.word_count_file, self.dt_candidates)
+            files = [self.word_count_file, self.dt_candidates]
+        if self.cache_file is not None:
+            splitter.cache = PersistentSplitCache(
+                self.cache_file, splitter.fingerprint(*files), max_size=self.cache_size
+            )
+        else:
+            splitter.cache = SplitCache(self.cache_size)
+        return splitter
+
+
+@dataclass
+class ModelStats:
+    """
+    Usage statistics of a model of the registry.
+    """
+
+    loaded: bool = False
+    size: int = 0
+    # the size of the cache, as of the last request
+    cache_size: int = 0
+    loads: int = 0
+    load_seconds: float = 0.0
+    evictions: int = 0
+    requests: int = 0
+    sentences: int = 0
+    words: int = 0
+
+
+class ModelRegistry:
+    """
+    Registry of named models, loaded on first use. When the estimated size of the
+    loaded models and their caches exceeds memory_budget (in bytes, 0 meaning no
+    limit), the least recently used ones are evicted. Since the caches grow with
+    the requests, the budget is checked again after each of them. The cache of an evicted model is closed once
+    the requests using it, see `use`, are done. It is safe to use from several
+    threads.
+    """
+
+    def __init__(self, memory_budget: int = 0) -> None:
+        self.memory_budget = memory_budget
+        self.specs: Dict[str, ModelSpec] = {}
+        self.stats: Dict[str, ModelStats] = {}
+        # loaded models, least recently used first
+        self.models: "OrderedDict[str, Splitter]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        # number of requests using each model, by id, and the evicted ones among them
+        self._users: Dict[int, int] = {}
+        self._evicted: Dict[int, Splitter] = {}
+
+    @classmethod
+    def from_config(cls, name: str) -> "ModelRegistry":
+        """
+        Read a JSON configuration with the memory budget in megabytes and the models
+        by name, e.g:
+
+            {"memory_budget_mb": 2048,
+             "models": {"de": {"model_file": "de.json.gz",
+                               "parameters": {"engine": "VITERBI"}},
+                        "nl": {"dt_candidates": "nl_candidates",
+                               "word_count_file": "nl_WordCount",
+                               "parameters": {"min_word_count": 50},
+                               "cache_file": "nl.sqlite"}}}
+        """
+        with nopen(name) as f:
+            config = json.load(f)
+        registry = cls(memory_budget=int(config.get("memory_budget_mb", 0) * 2 ** 20))
+        for (model, spec) in config["models"].items():
+            registry.add(ModelSpec(name=model, **spec))
+        return registry
+
+    def add(self, spec: ModelSpec) -> None:
+        """
+        Register a model, which is loaded on first use.
+        """
+        with self._lock:
+            self.specs[spec.name] = spec
+            self.stats.setdefault(spec.name, ModelStats())
+            self._load_locks.setdefault(spec.name, threading.Lock())
+
+    def add_splitter(self, name: str, splitter: Splitter) -> None:
+        """
+        Register an already loaded model. Since it cannot be loaded again, it is
+        never evicted.
+        """
+        with self._lock:
+            self.models[name] = splitter
+            self.stats[name] = ModelStats(
+                loaded=True, size=estimate_size(splitter), loads=1
+            )
+
+    def names(self) -> List[str]:
+        """
+        Return the names of all registered models.
+        """
+        with self._lock:
+            return list(self.stats)
+
+    def get(self, name: str) -> Splitter:
+        """
+        Return the model registered as name, loading it if needed. Raises KeyError
+        for unknown models.
+        """
+        return self._get(name, False)
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[Splitter]:
+        """
+        Return the model registered as name, see `get`, for the duration of a
+        request: if the model is evicted meanwhile, its cache is only closed once
+        all the requests using it are done.
+        """
+        splitter = self._get(name, True)
+        try:
+            yield splitter
+        finally:
+            with self._lock:
+                key = id(splitter)
+                self._users[key] -= 1
+                evicted = None
+                if self._users[key] == 0:
+                    del self._users[key]
+                    evicted = self._evicted.pop(key, None)
+            if evicted is not None:
+                evicted.cache.close()
+
+    def _acquire(self, splitter: Splitter, use: bool) -> Splitter:
+        """
+        Count a request using splitter if use is set, returning it.
+        """
+        if use:
+            self._users[id(splitter)] = self._users.get(id(splitter), 0) + 1
+        return splitter
+
+    def _get(self, name: str, use: bool) -> Splitter:
+        with self._lock:
+            if name in self.models:
+                self.models.move_to_end(name)
+                return self._acquire(self.models[name], use)
+            spec = self.specs[name]
+            load_lock = self._load_locks[name]
+        with load_lock:
+            with self._lock:
+                if name in self.models:
+                    return self._acquire(self.models[name], use)
+            logging.info(f"loading model {name}")
+            start = time.monotonic()
+            splitter = spec.load()
+            size = estimate_size(splitter)
+            with self._lock:
+                self.models[name] = self._acquire(splitter, use)
+                stats = self.stats[name]
+                stats.loaded = True
+                stats.size = size
+                stats.cache_size = splitter.cache.size
+                stats.loads += 1
+                stats.load_seconds += time.monotonic() - start
+                self._evict()
+            return splitter
+
+    def _evict(self) -> None:
+        """
+        Evict the least recently used models while over the memory budget, keeping
+        at least the most recently used one.
+        """
+        if self.memory_budget <= 0:
+            return
+        for name in list(self.models)[:-1]:
+            if self.memory_used() <= self.memory_budget:
+                return
+            if name not in self.specs:
+                continue
+            logging.info(f"evicting model {name}")
+            splitter = self.models.pop(name)
+            if id(splitter) in self._users:
+                self._evicted[id(splitter)] = splitter
+            else:
+                splitter.cache.close()
+            self.stats[name].loaded = False
+            self.stats[name].evictions += 1
+
+    def memory_used(self) -> int:
+        """
+        Return the estimated size of the loaded models and of their caches.
+        """
+        return sum(
+            self.stats[name].size + self.stats[name].cache_size for name in self.models
+        )
+
+    def record(self, name: str, sentences: int, words: int) -> None:
+        """
+        Count a request to the model name, evicting models if its cache grew over
+        the memory budget.
+        """
+        with self._lock:
+            stats = self.stats[name]
+            stats.requests += 1
+            stats.sentences += sentences
+            stats.words += words
+            if name in self.models:
+                stats.cache_size = self.models[name].cache.size
+                self._evict()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return the memory usage and the statistics of each model.
+        """
+        with self._lock:
+            return {
+                "memory_budget": self.memory_budget,
+                "memory_used": self.memory_used(),
+                "models": {
+                    name: dict(
+                        asdict(stats),
+                        cached_words=(
+                            len(self.models[name].cache) if name in self.models else 0
+                        ),
+                    )
+                    for (name, stats) in self.stats.items()
+                },
+            }
+
+    def close(self) -> None:
+        """
+        Close the caches of all loaded models, and of the evicted ones still in use.
+        """
+        with self._lock:
+            for splitter in list(self.models.values()) + list(self._evicted.values()):
+                splitter.cache.close()
+            self._evicted.clear()
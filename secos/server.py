@@ -0,0 +1,252 @@
+# Decompounding as a Service using an HTTP server
+
+import heapq
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .decompound import Splitter, nopen
+from .registry import ModelRegistry
+
+
+def decompound_sentence(splitter: Splitter, sentence: str) -> str:
+    """
+    Return the sentence with each of its words replaced by its atoms, separated by
+    spaces.
+    """
+    return " ".join(splitter.split_word(w).replace("-", " ") for w in sentence.split())
+
+
+class WarmUp(threading.Thread):
+    """
+    Background thread filling the splitter's cache with the splits of the count
+    most frequent words of the model, or of the query log if one is given (all of
+    its words if count is 0), most frequent first.
+    """
+
+    def __init__(
+        self, splitter: Splitter, count: int = 0, log: Optional[str] = None
+    ) -> None:
+        super().__init__(daemon=True)
+        self.splitter = splitter
+        self.count = count
+        self.log = log
+        self.total = 0
+        self.done = 0
+        self.start_time = 0.0
+        self.end_time: Optional[float] = None
+
+    def _words(self) -> List[str]:
+        """
+        Return the words to warm the cache up with.
+        """
+        if self.log is not None:
+            counts = Counter(w for l in nopen(self.log) for w in l.split())
+            return [w for (w, __) in counts.most_common(self.count or None)]
+        wc = self.splitter.word_count
+        return heapq.nlargest(self.count, wc, key=wc.__getitem__)
+
+    def run(self) -> None:
+        self.start_time = time.monotonic()
+        words = self._words()
+        self.total = len(words)
+        logging.info(f"warming up the cache with {self.total} words")
+        for w in words:
+            self.splitter.split_word(w)
+            self.done += 1
+        self.end_time = time.monotonic()
+        logging.info(f"warm-up done in {self.end_time - self.start_time:.1f}s")
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Return the progress of the warm-up.
+        """
+        elapsed = (self.end_time or time.monotonic()) - self.start_time
+        return {
+            "total": self.total,
+            "done": self.done,
+            "finished": self.end_time is not None,
+            "elapsed": elapsed,
+            "words_per_second": self.done / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+class DecompoundServer(ThreadingHTTPServer):
+    """
+    HTTP server decompounding sentences with the models of a registry, keeping the
+    decompounded words in the model's cache. Each connection is read by its own
+    thread, and the requests are decompounded by a pool of worker threads shared by
+    all models, so that idle keep-alive connections do not hold any worker.
+    """
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        registry: ModelRegistry,
+        default_model: str,
+        workers: int = 16,
+    ) -> None:
+        super().__init__(server_address, DecompoundHandler)
+        self.registry = registry
+        self.default_model = default_model
+        self.warmup: Optional[WarmUp] = None
+        self.pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="decompound"
+        )
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.pool.shutdown(wait=False)
+
+    def decompound(
+        self, sentences: List[str], model: Optional[str] = None, spans: bool = False
+    ) -> List[Any]:
+        """
+        Return the decompounded sentences, see `decompound_sentence`, or their spans
+        if asked, see `Splitter.split_spans`, using the given model or the default
+        one, on the worker pool. Raises KeyError for unknown models.
+        """
+        return self.pool.submit(self._decompound, sentences, model, spans).result()
+
+    def _decompound(
+        self, sentences: List[str], model: Optional[str], spans: bool
+    ) -> List[Any]:
+        name = model or self.default_model
+        with self.registry.use(name) as splitter:
+            if spans:
+                res: List[Any] = [list(splitter.split_spans(s)) for s in sentences]
+            else:
+                res = [decompound_sentence(splitter, s) for s in sentences]
+        words = sum(len(s.split()) for s in sentences)
+        self.registry.record(name, len(sentences), words)
+        return res
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Return the number of cached words of the default model and the progress of
+        the warm-up.
+        """
+        metrics = self.registry.metrics()["models"][self.default_model]
+        return {
+            "cached_words": metrics["cached_words"],
+            "warmup": self.warmup.status() if self.warmup is not None else None,
+        }
+
+
+class DecompoundHandler(BaseHTTPRequestHandler):
+    """
+    Answer GET requests with a `sentence` parameter with the decompounded sentence,
+    GET requests on `/status` and `/metrics` with the status of the server and the
+    statistics of its models as JSON, and POST requests with a JSON object
+    `{"sentences": [...]}` with the object `{"sentences": [...]}` of decompounded
+    sentences. The model can be selected with the `model` parameter or key, and
+    the `format` parameter or key set to `spans` returns the `{"spans": [...]}` of
+    the tokens instead, see `Splitter.split_spans`.
+    Connections are kept alive between requests, until idle for timeout seconds.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = 5
+    server: DecompoundServer
+
+    def _send(self, body: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, obj: Any) -> None:
+        self._send(json.dumps(obj).encode(), "application/json")
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path == "/status":
+            self._send_json(self.server.status())
+            return
+        if url.path == "/metrics":
+            self._send_json(self.server.registry.metrics())
+            return
+        query_components = parse_qs(url.query)
+        if "sentence" not in query_components:
+            self.send_error(400, "Missing 'sentence' parameter")
+            return
+        sentence = query_components["sentence"][0]
+        model = query_components.get("model", [None])[0]
+        spans = query_components.get("format", [None])[0] == "spans"
+        try:
+            (res,) = self.server.decompound([sentence], model, spans)
+        except KeyError:
+            self.send_error(404, f"Unknown model {model}")
+            return
+        if spans:
+            self._send_json({"spans": res})
+        else:
+            self._send(res.encode(), "text/html")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            query = json.loads(self.rfile.read(length))
+            sentences = query["sentences"]
+            model = query.get("model")
+            spans = query.get("format") == "spans"
+            if not isinstance(sentences, list) or not all(
+                isinstance(s, str) for s in sentences
+            ):
+                raise TypeError
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.send_error(400, "Expected a JSON object with a 'sentences' list")
+            return
+        try:
+            res = self.server.decompound(sentences, model, spans)
+        except KeyError:
+            self.send_error(404, f"Unknown model {model}")
+            return
+        self._send_json({"spans" if spans else "sentences": res})
+
+
+def serve(
+    registry: ModelRegistry,
+    port: int = 80,
+    default_model: Optional[str] = None,
+    warmup: Optional[WarmUp] = None,
+    workers: int = 16,
+) -> None:
+    """
+    Serve decompounding requests with the models of registry on the given port,
+    forever. The default model is the first registered one if not given. The
+    warm-up is started once the server accepts connections.
+    """
+    server_address = ("", port)
+    httpd = DecompoundServer(
+        server_address,
+        registry,
+        default_model or registry.names()[0],
+        workers=workers,
+    )
+    print(f"Starting httpd using port {port}")
+    if warmup is not None:
+        httpd.warmup = warmup
+        warmup.start()
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+        registry.close()
+
+
+def run(splitter: Splitter, port: int = 80, warmup: Optional[WarmUp] = None) -> None:
+    """
+    Serve decompounding requests with splitter on the given port, forever. The
+    warm-up is started once the server accepts connections.
+    """
+    registry = ModelRegistry()
+    registry.add_splitter("default", splitter)
+    serve(registry, port, warmup=warmup)
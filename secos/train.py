@@ -3,8 +3,9 @@
 import logging
 import re
 import sys
+from array import array
 from dataclasses import InitVar, dataclass, field
-from typing import Dict, Iterable, List, Pattern, TextIO
+from typing import Dict, Iterable, Iterator, List, Pattern, TextIO, Tuple
 
 
 def add_to_set(d: Dict[str, int], s: Iterable[str]) -> None:
@@ -23,13 +24,24 @@ def add_to_set(d: Dict[str, int], s: Iterable[str]) -> None:
 class Trainer:
     """
     Train the SECOS model from a distributional thesaurus.
+
+    Words are mapped to integer ids while reading, and the neighbours of each word
+    are stored in compressed sparse row form: the ids of the neighbours of word i
+    are neighbours[offsets[i]:offsets[i + 1]].
     """
 
     input: TextIO = sys.stdin
     split_dash: bool = False
-    dt: Dict[str, List[str]] = field(default_factory=dict, init=False)
+    words: List[str] = field(default_factory=list, init=False)
+    word_ids: Dict[str, int] = field(default_factory=dict, init=False)
+    offsets: "array[int]" = field(default_factory=lambda: array("l"), init=False)
+    neighbours: "array[int]" = field(default_factory=lambda: array("i"), init=False)
+    # ids of the words having neighbours, in order of first appearance
+    heads: "array[int]" = field(default_factory=lambda: array("i"), init=False)
     pattern: InitVar[str] = field(default=".*")
     accept: Pattern[str] = field(init=False)
+    # whether each word matches accept
+    _accepted: bytearray = field(default_factory=bytearray, init=False, repr=False)
 
     def __post_init__(self, pattern: str) -> None:
         """
@@ -55,45 +67,85 @@ class Trainer:
                         ret.append(l)
         return ret
 
+    def _word_id(self, w: str) -> int:
+        """
+        Return the id of w, assigning it the next one if it is new.
+        """
+        i = self.word_ids.get(w)
+        if i is None:
+            i = len(self.words)
+            self.word_ids[w] = i
+            self.words.append(w)
+            self._accepted.append(self.accept.match(w) is not None)
+        return i
+
     def _read_input(self) -> None:
         """
         Read the distributional thesaurus.
         """
+        sources = array("i")
+        targets = array("i")
         for l in self.input:
             ls = l.strip().split("\t")
-            w1 = ls[0]
-            w2 = ls[1]
-            if not (self.accept.match(w1) and self.accept.match(w2)):
-                logging.info(f"Not accepted: {w1}\t{w2}")
+            i1 = self._word_id(ls[0])
+            i2 = self._word_id(ls[1])
+            if not (self._accepted[i1] and self._accepted[i2]):
+                logging.info(f"Not accepted: {ls[0]}\t{ls[1]}")
                 continue
-            if w1 in self.dt:
-                self.dt[w1].append(w2)
-            else:
-                self.dt[w1] = [w2]
+            sources.append(i1)
+            targets.append(i2)
+        # counting sort of the pairs by their first word, keeping their order
+        counts = array("l", [0]) * (len(self.words) + 1)
+        for i in sources:
+            if counts[i + 1] == 0:
+                self.heads.append(i)
+            counts[i + 1] += 1
+        for i in range(len(self.words)):
+            counts[i + 1] += counts[i]
+        self.offsets = counts
+        positions = counts[:-1]
+        self.neighbours = array("i", [0]) * len(targets)
+        for (i1, i2) in zip(sources, targets):
+            self.neighbours[positions[i1]] = i2
+            positions[i1] += 1
 
-    def train(self, output: TextIO = sys.stdout) -> None:
+    def _neighbours(self, i: int) -> List[str]:
         """
-        Train on the input given at construction, outuput training data to output file
-        given in argument.
+        Return the neighbours of the word of id i.
+        """
+        (words, offsets) = (self.words, self.offsets)
+        return [words[j] for j in self.neighbours[offsets[i] : offsets[i + 1]]]
+
+    def candidates(self) -> Iterator[Tuple[str, List[str], Dict[str, int]]]:
+        """
+        Train on the input given at construction, yielding for each word the words
+        of its neighbours contained in it, and the number of times each word
+        contained in it appears in the neighbours of its neighbours.
         """
         self._read_input()
+        offsets = self.offsets
 
-        for w1 in self.dt:
-            sims = self.dt[w1]
-            word_overlap = self._get_overlap(w1, sims)
+        for i1 in self.heads:
+            w1 = self.words[i1]
+            sims = self.neighbours[offsets[i1] : offsets[i1 + 1]]
+            word_overlap = self._get_overlap(w1, self._neighbours(i1))
             sims_overlap: Dict[str, int] = {}
-            for w2 in sims:
-                if w2 in self.dt:
-                    overlap = self._get_overlap(w1, self.dt[w2])
+            for i2 in sims:
+                if offsets[i2] != offsets[i2 + 1]:
+                    overlap = self._get_overlap(w1, self._neighbours(i2))
                     add_to_set(sims_overlap, overlap)
-            out1 = ""
-            out2 = ""
-            out3 = " ".join(word_overlap)
-            for w2 in sims_overlap:
-                out1 += " " + w2
-                out2 += " " + w2 + ":" + str(sims_overlap[w2])
-            out3 = out3 + out1
-            out1 = out1.strip()
+            yield (w1, word_overlap, sims_overlap)
+
+    def train(self, output: TextIO = sys.stdout) -> None:
+        """
+        Train on the input given at construction, outuput training data to output file
+        given in argument.
+        """
+        for (w1, word_overlap, sims_overlap) in self.candidates():
+            sims_joined = "".join(" " + w2 for w2 in sims_overlap)
+            out1 = sims_joined.strip()
+            out2 = "".join(f" {w2}:{c}" for (w2, c) in sims_overlap.items())
+            out3 = " ".join(word_overlap) + sims_joined
             print(
                 f"{w1}\t{' '.join(word_overlap)}\t{out1}\t{out3}\t{out2}", file=output
             )
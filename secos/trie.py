@@ -0,0 +1,39 @@
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Key under which a node stores the value of the word ending at that node. Since
+# every edge is labelled with a single character, the empty string never clashes.
+_END = ""
+
+
+class Trie:
+    """
+    A character trie mapping case-folded keys to their original spelling, used to
+    find all dictionary words starting at a given position of a word.
+    """
+
+    def __init__(self) -> None:
+        self.root: Dict[str, Any] = {}
+
+    def add(self, key: str, value: str) -> None:
+        """
+        Insert key in the trie, mapping it to value. The first value inserted for a
+        given key is kept, so the keys should be inserted in a deterministic order.
+        """
+        node = self.root
+        for c in key:
+            node = node.setdefault(c, {})
+        node.setdefault(_END, value)
+
+    def matches(self, s: str, start: int = 0) -> Iterator[Tuple[int, str]]:
+        """
+        Yield the end index and value of every key which is a prefix of s[start:],
+        in increasing order of length.
+        """
+        node = self.root
+        for i in range(start, len(s)):
+            child: Optional[Dict[str, Any]] = node.get(s[i])
+            if child is None:
+                return
+            node = child
+            if _END in node:
+                yield (i + 1, node[_END])
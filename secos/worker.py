@@ -0,0 +1,108 @@
+# Long-lived decompounding worker speaking newline-delimited JSON
+
+import io
+import json
+import logging
+import os
+import socketserver
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Any, Dict, Union
+
+from .decompound import Splitter
+
+# binary streams, e.g: sys.stdin.buffer or the files of a socket connection
+_Stream = Union[IO[bytes], io.BufferedIOBase]
+
+
+class Worker:
+    """
+    Split batches of tokens sent as newline-delimited JSON, over a pair of streams
+    (e.g: stdin and stdout) or the connections to a Unix domain socket.
+
+    Each request is a line holding an object `{"id": ..., "tokens": [...]}`, and
+    is answered by a line holding `{"id": ..., "splits": [...]}` with the split of
+    each token (see `Splitter.split_words`), or `{"id": ..., "error": ...}`.
+    Requests are handled concurrently by a pool of threads sharing the splitter and
+    its cache, so a client can keep many of them in flight. The responses are sent
+    as soon as they are ready, which may not be the order of the requests: the id
+    tells them apart. At most max_pending requests of a stream are read ahead.
+    """
+
+    def __init__(
+        self, splitter: Splitter, workers: int = 4, max_pending: int = 64
+    ) -> None:
+        self.splitter = splitter
+        self.max_pending = max_pending
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="worker")
+
+    def handle(self, line: bytes) -> Dict[str, Any]:
+        """
+        Return the response to a request.
+        """
+        try:
+            request = json.loads(line)
+            rid = request.get("id")
+        except (ValueError, AttributeError):
+            return {"id": None, "error": "Expected a JSON object"}
+        tokens = request.get("tokens")
+        if not isinstance(tokens, list) or not all(isinstance(t, str) for t in tokens):
+            return {"id": rid, "error": "Expected a 'tokens' list of strings"}
+        return {"id": rid, "splits": self.splitter.split_words(tokens)}
+
+    def serve_stream(self, input: _Stream, output: _Stream) -> None:
+        """
+        Answer the requests read from input on output, until the end of input.
+        """
+        lock = threading.Lock()
+        pending = threading.BoundedSemaphore(self.max_pending)
+
+        def respond(future: "Future[Dict[str, Any]]") -> None:
+            try:
+                response = future.result()
+            except Exception as e:
+                logging.exception("request failed")
+                response = {"id": None, "error": str(e)}
+            with lock:
+                try:
+                    output.write(json.dumps(response).encode() + b"\n")
+                    output.flush()
+                except OSError as e:
+                    logging.warning(f"could not send response: {e}")
+            pending.release()
+
+        for line in input:
+            if not line.strip():
+                continue
+            pending.acquire()
+            self.pool.submit(self.handle, line).add_done_callback(respond)
+        # wait for the requests in flight
+        for __ in range(self.max_pending):
+            pending.acquire()
+
+    def serve_unix(self, path: str) -> None:
+        """
+        Answer the requests sent to the Unix domain socket at path, forever.
+        """
+        worker = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                worker.serve_stream(self.rfile, self.wfile)
+
+        if os.path.exists(path):
+            os.unlink(path)
+        with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+            server.daemon_threads = True
+            logging.info(f"listening on {path}")
+            try:
+                server.serve_forever()
+            finally:
+                os.unlink(path)
+
+    def close(self) -> None:
+        """
+        Stop the pool of threads and close the splitter's cache.
+        """
+        self.pool.shutdown()
+        self.splitter.cache.close()
@@ -24,5 +24,6 @@ setuptools.setup(
     ],
     packages=setuptools.find_packages(include=['secos', 'secos.*']),
     python_requires=">=3.7",
-    install_requires=["scipy"],
+    # only needed by the evaluation scripts and secos.eval
+    extras_require={"eval": ["numpy", "scipy"]},
 )
@@ -0,0 +1,58 @@
+import os
+from typing import Any, Dict, List
+
+from secos import Splitter
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+# a tiny model: the candidates of a few compounds, and the counts of their parts
+CANDIDATES = os.path.join(DATA, "candidates.tsv")
+WORD_COUNT = os.path.join(DATA, "word_count.tsv")
+
+# words known, unknown, and dashed, some of them sharing their parts
+WORDS = [
+    "Hausgarten",
+    "Gartenhaus",
+    "Haustür",
+    "Sonnenblume",
+    "Sonnenblumenwald",
+    "Hefeweizenbier",
+    "Apfelbaumhaus",
+    "Dachfensterrahmen",
+    "Zitroneneis",
+    "Wald",
+    "Auto-Hausgarten",
+    "-Hausgarten",
+    "Haus--Gartenzimmer",
+    "Apfel-Sonnenblumenwald",
+]
+
+
+def splitter(**kwargs: Any) -> Splitter:
+    """
+    Return a splitter with the parameters of the tiny model, overridden by kwargs,
+    without loading it.
+    """
+    params: Dict[str, Any] = dict(
+        min_word_count=50, min_word_length=3, uppercase_first_letter=True
+    )
+    params.update(kwargs)
+    return Splitter(**params)
+
+
+def load(**kwargs: Any) -> Splitter:
+    """
+    Return a splitter with the tiny model loaded, see `splitter`.
+    """
+    s = splitter(**kwargs)
+    s.prepare_decompounding(WORD_COUNT, CANDIDATES)
+    return s
+
+
+def sentences(count: int = 40) -> List[str]:
+    """
+    Return count sentences of three words.
+    """
+    return [
+        " ".join(WORDS[(i + j) % len(WORDS)] for j in range(3)) for i in range(count)
+    ]
@@ -0,0 +1,149 @@
+import asyncio
+import re
+import socket
+import threading
+import time
+import unittest
+from typing import Any, List
+
+from secos import Splitter
+from secos.client import AsyncClient, Client, ClientError
+from secos.registry import ModelRegistry
+from secos.server import DecompoundHandler, DecompoundServer
+
+from .common import load, sentences
+
+BATCH_SIZE = 8
+WORKERS = 2
+
+
+class QuietHandler(DecompoundHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class ClientTest(unittest.TestCase):
+    """
+    The synchronous and asynchronous clients, against a local server instance and
+    in-process.
+    """
+
+    splitter: Splitter
+    registry: ModelRegistry
+    server: DecompoundServer
+    url: str
+    unreachable: str
+    sentences: List[str]
+    expected: List[str]
+    expected_spans: List[Any]
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.splitter = load(dash_words=Splitter.DashBehaviour.SPLIT)
+        cls.registry = ModelRegistry()
+        cls.registry.add_splitter("default", cls.splitter)
+        cls.server = DecompoundServer(
+            ("127.0.0.1", 0), cls.registry, "default", workers=WORKERS
+        )
+        cls.server.RequestHandlerClass = QuietHandler
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.sentences = sentences()
+        local = Client(splitter=cls.splitter)
+        cls.expected = local.decompound(cls.sentences)
+        cls.expected_spans = local.spans(cls.sentences)
+        # a port nothing listens on, for the clients to give up on
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            cls.unreachable = f"http://127.0.0.1:{s.getsockname()[1]}"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def requests(self) -> int:
+        return self.registry.stats["default"].requests
+
+    def batches(self) -> int:
+        return -(-len(self.sentences) // BATCH_SIZE)
+
+    def test_local_fallback(self) -> None:
+        split = [
+            " ".join(self.splitter.split_word(w).replace("-", " ") for w in s.split())
+            for s in self.sentences
+        ]
+        self.assertEqual(self.expected, split)
+        self.assertIn("Auto Haus garten", " ".join(self.expected))
+
+    def test_spans(self) -> None:
+        # inserting dashes at the boundaries gives back the split, without the
+        # dashes of the word which the split drops or merges
+        def dashes(w: str) -> str:
+            return re.sub("-+", "-", w).strip("-")
+
+        for text in self.sentences:
+            for (start, end, boundaries) in self.splitter.split_spans(text):
+                w = text[start:end]
+                cuts = [0] + [b - start for b in boundaries] + [len(w)]
+                joined = "-".join(w[i:j] for (i, j) in zip(cuts, cuts[1:]))
+                self.assertEqual(dashes(joined), dashes(self.splitter.split_word(w)))
+        self.assertEqual(list(self.splitter.split_spans("-Hausgarten")), [(0, 11, [5])])
+
+    def test_sync(self) -> None:
+        with Client(self.url, batch_size=BATCH_SIZE) as client:
+            before = self.requests()
+            self.assertEqual(client.decompound(self.sentences), self.expected)
+            self.assertEqual(self.requests() - before, self.batches())
+            self.assertEqual(client.spans(self.sentences), self.expected_spans)
+
+    def test_sync_retries(self) -> None:
+        client = Client(self.unreachable, retries=2, backoff=0.01)
+        with self.assertRaises(ClientError):
+            client.decompound(self.sentences[:1])
+
+    def test_idle_connections(self) -> None:
+        # more clients keeping an idle connection than workers do not block requests
+        clients = [Client(self.url) for __ in range(WORKERS + 2)]
+        try:
+            for client in clients:
+                client.decompound(self.sentences[:1])
+            start = time.monotonic()
+            with Client(self.url) as client:
+                self.assertEqual(client.decompound(self.sentences), self.expected)
+            self.assertLess(time.monotonic() - start, 2)
+        finally:
+            for client in clients:
+                client.close()
+
+    def test_async(self) -> None:
+        async def run() -> None:
+            async with AsyncClient(self.url, batch_size=BATCH_SIZE) as client:
+                before = self.requests()
+                self.assertEqual(await client.decompound(self.sentences), self.expected)
+                self.assertEqual(self.requests() - before, self.batches())
+                res: List[Any] = await client.spans(self.sentences)
+                self.assertEqual(res, self.expected_spans)
+
+        asyncio.run(run())
+
+    def test_async_local_fallback(self) -> None:
+        async def run() -> None:
+            async with AsyncClient(splitter=self.splitter) as client:
+                self.assertEqual(await client.decompound(self.sentences), self.expected)
+                res: List[Any] = await client.spans(self.sentences)
+                self.assertEqual(res, self.expected_spans)
+
+        asyncio.run(run())
+
+    def test_async_retries(self) -> None:
+        async def run() -> None:
+            client = AsyncClient(self.unreachable, retries=2, backoff=0.01)
+            with self.assertRaises(ClientError):
+                await client.decompound(self.sentences[:1])
+
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
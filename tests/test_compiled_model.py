@@ -0,0 +1,159 @@
+import random
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from secos import CompiledModel, Splitter
+from secos.cache import SplitCache
+
+from .common import CANDIDATES, WORD_COUNT, WORDS, load, splitter
+
+THREADS = 4
+ROUNDS = 2
+RELOADS = 2
+
+
+def operations(s: Splitter) -> List[Callable[[], None]]:
+    """
+    Return the loads of the data of s done under load, in order. Since the word
+    counts are added to the loaded ones, reading them again changes the splits.
+    """
+    return [
+        lambda: s.read_knowledge(CANDIDATES),
+        s.extract_single_words,
+        lambda: s.read_word_count(WORD_COUNT),
+    ] * RELOADS
+
+
+def shape(model: CompiledModel) -> Tuple[int, ...]:
+    """
+    Return the sizes of the containers of model, which must never change.
+    """
+    return (
+        len(model.comp1),
+        len(model.comp2),
+        len(model.comp3),
+        len(model._part_count),
+        len(model._folded_single_words),
+    )
+
+
+class ConcurrencyTest(unittest.TestCase):
+    """
+    Concurrent queries, while the cache is replaced and the data is read under load,
+    against serial ones.
+    """
+
+    def query(
+        self,
+        s: Splitter,
+        expected: Dict[str, Set[str]],
+        done: threading.Event,
+        seed: int,
+    ) -> Tuple[List[str], int]:
+        """
+        Split all words in a random order, at least ROUNDS times and until done is
+        set, returning the ones whose split is not the one of any state of the data,
+        and the number of compiled models changed after being compiled.
+        """
+        rng = random.Random(seed)
+        order = list(WORDS)
+        mismatches = []
+        models: Dict[int, Tuple[CompiledModel, Tuple[int, ...]]] = {}
+        i = 0
+        while i < ROUNDS or not done.is_set():
+            rng.shuffle(order)
+            for w in order:
+                model = s.compile()
+                if id(model) not in models:
+                    models[id(model)] = (model, shape(model))
+                if model.split_word(w) not in expected[w]:
+                    mismatches.append(w)
+            i += 1
+        mutated = sum(shape(model) != sizes for (model, sizes) in models.values())
+        return (mismatches, mutated)
+
+    def check(self, **kwargs: Any) -> None:
+        decompounder = splitter(**kwargs)
+        decompounder.read_word_count(WORD_COUNT)
+        # the splits of every state the data goes through, replaying the loads
+        replica = splitter(**kwargs)
+        replica.read_word_count(WORD_COUNT)
+        expected: Dict[str, Set[str]] = {w: set() for w in WORDS}
+        for operation in [lambda: None] + operations(replica):
+            operation()
+            for w in WORDS:
+                expected[w].add(replica.split_compound(w) or w)
+        done = threading.Event()
+
+        def reload() -> None:
+            for operation in operations(decompounder):
+                decompounder.cache = SplitCache()
+                time.sleep(0.01)
+                operation()
+            done.set()
+
+        reloader = threading.Thread(target=reload)
+        reloader.start()
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            results = list(
+                pool.map(
+                    self.query,
+                    [decompounder] * THREADS,
+                    [expected] * THREADS,
+                    [done] * THREADS,
+                    range(THREADS),
+                )
+            )
+        reloader.join()
+        self.assertEqual(sorted({w for (ws, __) in results for w in ws}), [])
+        self.assertEqual(sum(mutated for (__, mutated) in results), 0)
+        # once loaded, the splits are the ones of the final state
+        for w in WORDS:
+            self.assertEqual(
+                decompounder.split_word(w), replica.split_compound(w) or w, w
+            )
+
+    def test_concurrent_queries(self) -> None:
+        for engine in Splitter.Engine:
+            for dash_words in Splitter.DashBehaviour:
+                with self.subTest(engine=engine.name, dash_words=dash_words.name):
+                    self.check(engine=engine, dash_words=dash_words)
+
+
+class InvalidationTest(unittest.TestCase):
+    """
+    The splits after the parameters or the data change.
+    """
+
+    def test_parameters(self) -> None:
+        s = load()
+        before = {w: s.split_word(w) for w in WORDS}
+        for (name, value) in (
+            ("engine", Splitter.Engine.VITERBI),
+            ("epsilon", 0.5),
+            ("prefix_length", 5),
+            ("dash_words", Splitter.DashBehaviour.SPLIT),
+        ):
+            setattr(s, name, value)
+            for w in WORDS:
+                self.assertEqual(s.split_word(w), s.split_compound(w) or w, name)
+        self.assertNotEqual(before, {w: s.split_word(w) for w in WORDS})
+
+    def test_dashed_parts(self) -> None:
+        s = splitter(dash_words=Splitter.DashBehaviour.SPLIT)
+        s.read_word_count(WORD_COUNT)
+        self.assertIsNone(s.split_compound("Auto-Hausgarten"))
+        s.read_knowledge(CANDIDATES)
+        s.extract_single_words()
+        self.assertEqual(s.split_compound("Hausgarten"), "Haus-garten")
+        self.assertEqual(s.split_compound("Xy-Hausgarten"), "Xy-Haus-garten")
+        # the parts are not read from the shared cache
+        s.cache.put("Hausgarten", "Hausgarten")
+        self.assertEqual(s.split_compound("Zz-Hausgarten"), "Zz-Haus-garten")
+
+
+if __name__ == "__main__":
+    unittest.main()
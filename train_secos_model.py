@@ -0,0 +1,87 @@
+#! /usr/bin/env python3
+
+# Training a ready-to-load decompounding model directly from a distributional
+# thesaurus, without writing the candidates file
+
+import logging
+import sys
+
+from secos import Splitter, Trainer
+
+logging.basicConfig(
+    format="%(asctime)s : %(levelname)s : %(message)s", level=logging.INFO
+)
+
+
+def eprint(*args, **kwargs) -> None:
+    print(*args, file=sys.stderr, **kwargs)
+
+
+if len(sys.argv) < 10:
+    eprint(
+        f"cat dt | python {sys.argv[0]} word_count_file model_file "
+        "min_word_count(50) prefix_length(3) suffix_length(3) word_length(5) "
+        "dash_word(3) upper(upper) epsilon [pattern] [split_dash]"
+    )
+    eprint("-----------------------------------------------------")
+    eprint("Parameter description:")
+    eprint("-----------------------------------------------------")
+    eprint("word_count_file:\tfile with word counts used for filtering")
+    eprint(
+        "model_file:\t\tfile the model is written to, compressed if it ends in '.gz'"
+    )
+    eprint(
+        "min_word_count:\t\tminimal word count used for split candidates "
+        "(recommended paramater: 50)"
+    )
+    eprint(
+        "prefix_length:\t\tlength of prefixes that are appended to the right-sided "
+        "word (recommended parameter: 3)"
+    )
+    eprint(
+        "suffix_length:\t\tlength of suffixes that are appended to the left-sided "
+        "word (recommended parameter: 3)"
+    )
+    eprint(
+        "word_length:\t\tminimal word length that is used from the split "
+        "candidates (recommended parameter: 5)"
+    )
+    eprint(
+        "dash_word:\t\theuristic to split words with dash, which has no big impact "
+        "(recommended: 3)"
+    )
+    eprint(
+        "upper:\t\t\tconsider uppercase letters (=upper) or not (=lower). "
+        "Should be set for case-sensitive languages e.g. German"
+    )
+    eprint("epsilon:\t\tsmoothing factor (recommended parameter: 0.01")
+    eprint("pattern:\t\tregular expression the words of the DT must match")
+    eprint("split_dash:\t\talso use the parts of dashed neighbours if given")
+    sys.exit(1)
+
+
+decompounder = Splitter(
+    min_word_count=int(sys.argv[3]),
+    prefix_length=int(sys.argv[4]),
+    suffix_length=int(sys.argv[5]),
+    min_word_length=int(sys.argv[6]),
+    # 1 -> remove, 2 -> split, 3 -> nothing
+    dash_words=Splitter.DashBehaviour(int(sys.argv[7])),
+    uppercase_first_letter=True if sys.argv[8] == "upper" else False,
+    epsilon=float(sys.argv[9]),
+)
+
+trainer = Trainer(
+    pattern=sys.argv[10] if len(sys.argv) > 10 else ".*",
+    split_dash=True if len(sys.argv) > 11 else False,
+)
+
+file_wordcount = sys.argv[1]
+file_model = sys.argv[2]
+
+logging.info("reading word count")
+decompounder.read_word_count(file_wordcount)
+logging.info("training")
+decompounder.read_trainer(trainer)
+logging.info("writing model")
+decompounder.save_model(file_model)